@@ -1,19 +1,33 @@
 from __future__ import annotations
 import logging
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import itertools
+import functools
+import os
 import pandas as pd
 import numpy as np
-import panel as pn
-from IPython.display import display, Markdown
 
 from bdikit.schema_matching.one2one.base import BaseSchemaMatcher
 from bdikit.schema_matching.one2one.matcher_factory import SchemaMatchers
 from bdikit.schema_matching.topk.base import BaseTopkSchemaMatcher
 from bdikit.schema_matching.topk.matcher_factory import TopkMatchers
-from bdikit.value_matching.base import BaseValueMatcher, ValueMatch, ValueMatchingResult
+from bdikit.value_matching.base import (
+    BaseValueMatcher,
+    ValueMatch,
+    ValueMatches,
+    ValueMatchingResult,
+)
 from bdikit.value_matching.matcher_factory import ValueMatchers
+from bdikit.value_matching.exact import ExactValueMatcher
+from bdikit.value_matching.memo import (
+    RankedMatches,
+    ValueMatchStore,
+    get_domain_key,
+    get_matcher_key,
+)
 from bdikit.standards.standard_factory import Standards
+from bdikit.standards.target_schema import TargetSchema
 
 from bdikit.mapping_functions import (
     ValueMapper,
@@ -31,12 +45,11 @@ from typing import (
     Tuple,
     Callable,
     Any,
+    NamedTuple,
 )
 
 from bdikit.config import DEFAULT_SCHEMA_MATCHING_METHOD, DEFAULT_VALUE_MATCHING_METHOD
 
-pn.extension("tabulator")
-
 logger = logging.getLogger(__name__)
 
 
@@ -85,15 +98,18 @@ def match_schema(
     return pd.DataFrame(matches.items(), columns=["source", "target"])
 
 
-def _load_table_for_standard(name: str) -> pd.DataFrame:
+def _load_table_for_standard(name: str) -> TargetSchema:
     """
     Load the table for the given standard data vocabulary. Currently, only the
     GDC standard is supported.
     """
     standard = Standards.get_standard(name)
-    df = standard.get_dataframe_rep()
+    schema = standard.get_target_schema()
+    # Allows column embedders to reuse precomputed embeddings of the standard
+    schema.attrs["standard"] = name
+    schema.attrs["standard_version"] = standard.get_version()
 
-    return df
+    return schema
 
 
 def top_matches(
@@ -158,6 +174,10 @@ def match_values(
     column_mapping: Union[Tuple[str, str], pd.DataFrame],
     method: Union[str, BaseValueMatcher] = DEFAULT_VALUE_MATCHING_METHOD,
     method_args: Optional[Dict[str, Any]] = None,
+    executor: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    memo: Union[None, bool, str, ValueMatchStore] = None,
+    exact_match: bool = True,
 ) -> Union[pd.DataFrame, List[pd.DataFrame]]:
     """
     Finds matches between column values from the source dataset and column
@@ -183,6 +203,25 @@ def match_values(
           matching.
         method_args (Dict[str, Any], optional): The additional arguments of the
             method for value matching.
+        executor (str, optional): How the column mappings are matched: one
+            after another if None (the default), or concurrently by a pool of
+            threads ("thread") or processes ("process"). Threads suit matchers
+            that wait on remote APIs (e.g., GPT) or release the GIL, processes
+            suit CPU-bound matchers. The matcher and the target domains are
+            sent once to each worker process.
+        max_workers (int, optional): The maximum number of workers of the
+            pool. Defaults to the number of CPUs.
+        memo (Union[bool, str, ValueMatchStore], optional): A persistent
+            store of the matches of each source value (see ValueMatchStore),
+            given as a store, the path of its database, or True to use the
+            default path. Only the values that are not in the store are sent
+            to the matcher, and the numbers of values found in the store and
+            matched are reported in the "memo_hits" and "memo_misses" attrs
+            of the resulting DataFrames. Defaults to None (no store).
+        exact_match (bool, optional): Whether the source values that are equal
+            to a target value, up to case and whitespace, are matched to it
+            directly (with similarity 1.0) instead of being sent to the
+            method. Defaults to True.
 
     Returns:
         Union[pd.DataFrame, List[pd.DataFrame]]: A list of DataFrame objects containing
@@ -194,6 +233,7 @@ def match_values(
           'target' columns.
         ValueError: If the target is neither a DataFrame nor a standard vocabulary name.
         ValueError: If the source column is not present in the source dataset.
+        ValueError: If the executor is not None, "thread" or "process".
     """
     if method_args is None:
         method_args = {}
@@ -204,7 +244,17 @@ def match_values(
         )
         method_args["top_k"] = 1
 
-    matches = _match_values(source, target, column_mapping, method, method_args)
+    matches = _match_values(
+        source,
+        target,
+        column_mapping,
+        method,
+        method_args,
+        executor=executor,
+        max_workers=max_workers,
+        memo=memo,
+        exact_match=exact_match,
+    )
 
     if isinstance(column_mapping, tuple):
         if len(matches) == 0:
@@ -226,6 +276,10 @@ def top_value_matches(
     top_k: int = 5,
     method: str = DEFAULT_VALUE_MATCHING_METHOD,
     method_args: Optional[Dict[str, Any]] = None,
+    executor: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    memo: Union[None, bool, str, ValueMatchStore] = None,
+    exact_match: bool = False,
 ) -> List[pd.DataFrame]:
     """
     Finds top value matches between column values from the source dataset and column
@@ -253,6 +307,26 @@ def top_value_matches(
           matching.
         method_args (Dict[str, Any], optional): The additional arguments of the
             method for value matching.
+        executor (str, optional): How the column mappings are matched: one
+            after another if None (the default), or concurrently by a pool of
+            threads ("thread") or processes ("process"). Threads suit matchers
+            that wait on remote APIs (e.g., GPT) or release the GIL, processes
+            suit CPU-bound matchers. The matcher and the target domains are
+            sent once to each worker process.
+        max_workers (int, optional): The maximum number of workers of the
+            pool. Defaults to the number of CPUs.
+        memo (Union[bool, str, ValueMatchStore], optional): A persistent
+            store of the matches of each source value (see ValueMatchStore),
+            given as a store, the path of its database, or True to use the
+            default path. Only the values that are not in the store are sent
+            to the matcher, and the numbers of values found in the store and
+            matched are reported in the "memo_hits" and "memo_misses" attrs
+            of the resulting DataFrames. Defaults to None (no store).
+        exact_match (bool, optional): Whether the source values that are equal
+            to a target value, up to case and whitespace, are matched to it
+            directly (with similarity 1.0) instead of being sent to the
+            method. These values then get a single match instead of their
+            top-k matches. Defaults to False.
 
     Returns:
         List[pd.DataFrame]: A list of DataFrame objects containing
@@ -263,6 +337,7 @@ def top_value_matches(
           'target' columns.
         ValueError: If the target is neither a DataFrame nor a standard vocabulary name.
         ValueError: If the source column is not present in the source dataset.
+        ValueError: If the executor is not None, "thread" or "process".
     """
     if method_args is None:
         method_args = {}
@@ -274,7 +349,17 @@ def top_value_matches(
 
     method_args["top_k"] = top_k
 
-    matches = _match_values(source, target, column_mapping, method, method_args)
+    matches = _match_values(
+        source,
+        target,
+        column_mapping,
+        method,
+        method_args,
+        executor=executor,
+        max_workers=max_workers,
+        memo=memo,
+        exact_match=exact_match,
+    )
 
     match_list = []
     for match in matches:
@@ -307,6 +392,9 @@ def view_value_matches(
     else:
         raise ValueError("The matches must be a DataFrame or a list of DataFrames")
 
+    # IPython and panel are only needed (and imported) for displaying matches
+    from IPython.display import display, Markdown
+
     # Grouping DataFrames by metadata (source and target columns)
     grouped_matches = defaultdict(list)
     for match_df in match_list:
@@ -324,30 +412,68 @@ def view_value_matches(
         )
         for match_df in match_dfs:
             if edit:
+                pn = _get_panel_with_tabulator()
                 match_widget = pn.widgets.Tabulator(match_df, disabled=not edit)
                 display(match_widget)
             else:
                 display(match_df)
 
 
+@functools.lru_cache(maxsize=None)
+def _get_panel_with_tabulator():
+    """Imports panel and loads its tabulator extension once, on first use."""
+    import panel as pn
+
+    pn.extension("tabulator")
+    return pn
+
+
 def _match_values(
     source: pd.DataFrame,
     target: Union[str, pd.DataFrame],
     column_mapping: Union[Tuple[str, str], pd.DataFrame],
-    method: str,
+    method: Union[str, BaseValueMatcher],
     method_args: Dict[str, Any],
+    executor: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    memo: Union[None, bool, str, ValueMatchStore] = None,
+    exact_match: bool = True,
 ) -> List[pd.DataFrame]:
 
     target_domain, column_mapping_list = _format_value_matching_input(
         source, target, column_mapping
     )
-    value_matcher = ValueMatchers.get_matcher(method, **method_args)
-    mapping_results: List[ValueMatchingResult] = []
+    if isinstance(method, str):
+        value_matcher = ValueMatchers.get_matcher(method, **method_args)
+    elif isinstance(method, BaseValueMatcher):
+        value_matcher = method
+    else:
+        raise ValueError(
+            "The method must be a string or an instance of BaseValueMatcher"
+        )
+    if executor not in (None, "thread", "process"):
+        raise ValueError("The executor must be None, 'thread' or 'process'")
+
+    store: Optional[ValueMatchStore]
+    if memo is None or memo is False:
+        store = None
+    elif memo is True:
+        store = ValueMatchStore()
+    elif isinstance(memo, str):
+        store = ValueMatchStore(memo)
+    elif isinstance(memo, ValueMatchStore):
+        store = memo
+    else:
+        raise ValueError(
+            "The memo must be a boolean, a path or an instance of ValueMatchStore"
+        )
+    matcher_key = get_matcher_key(method, method_args) if store is not None else ""
 
+    # 1. Select candidate columns for value mapping
+    tasks: List[Tuple[str, str, np.ndarray]] = []
     for mapping in column_mapping_list:
         source_column, target_column = mapping["source"], mapping["target"]
 
-        # 1. Select candidate columns for value mapping
         target_domain_list = target_domain[target_column]
         if target_domain_list is None or len(target_domain_list) == 0:
             continue
@@ -356,19 +482,183 @@ def _match_values(
         if _skip_values(unique_values):
             continue
 
-        # 2. Remove blank spaces to the unique values
-        source_values_dict: Dict[str, Any] = {str(x).strip(): x for x in unique_values}
-        target_values_dict: Dict[str, str] = {
-            str(x).strip(): x for x in target_domain_list
-        }
+        tasks.append((source_column, target_column, unique_values))
+
+    # 2. Remove blank spaces from the target values (once per target column)
+    # and group the mappings with the same source and target domains, so that
+    # the matcher runs once per distinct pair of domains
+    target_values_dicts: Dict[str, Dict[str, Any]] = {}
+    target_domain_keys: Dict[str, str] = {}
+    domain_owners: Dict[Tuple[Tuple[str, Any], ...], str] = {}
+    for _, target_column, _ in tasks:
+        if target_column not in target_values_dicts:
+            target_values_dict = {
+                str(x).strip(): x for x in target_domain[target_column]
+            }
+            target_values_dicts[target_column] = target_values_dict
+            # columns with the same domain share the key of the first one
+            target_domain_keys[target_column] = domain_owners.setdefault(
+                tuple(target_values_dict.items()), target_column
+            )
+
+    unique_tasks: List[Tuple[str, str, np.ndarray]] = []
+    unique_task_indexes: Dict[Any, int] = {}
+    task_indexes: List[int] = []
+    for task in tasks:
+        source_column, target_column, unique_values = task
+        try:
+            # values are keyed with their types, since equal values of different
+            # types (e.g., 1, 1.0 and True) are matched as different strings
+            key: Any = (
+                frozenset((type(x), x) for x in unique_values),
+                target_domain_keys[target_column],
+            )
+        except TypeError:  # unhashable source values are never grouped
+            key = len(task_indexes)
+        if key not in unique_task_indexes:
+            unique_task_indexes[key] = len(unique_tasks)
+            unique_tasks.append(task)
+        task_indexes.append(unique_task_indexes[key])
+
+    # Only the domains of the mapped target columns are sent to the workers
+    context = _ValueMatchingContext(
+        value_matcher=value_matcher,
+        target_values_dicts={
+            target_column: target_values_dicts[target_column]
+            for _, target_column, _ in unique_tasks
+        },
+        store=store,
+        matcher_key=matcher_key,
+        exact_match=exact_match,
+    )
+    if executor is None or len(unique_tasks) <= 1:
+        unique_results = [_match_column_values(context, *task) for task in unique_tasks]
+    else:
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        max_workers = max(1, min(max_workers, len(unique_tasks)))
+        if executor == "thread":
+            # Threads share the matcher and the domains, nothing is copied
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                unique_results = list(
+                    pool.map(
+                        lambda task: _match_column_values(context, *task),
+                        unique_tasks,
+                    )
+                )
+        else:
+            # The matcher and the domains are sent once to each worker process
+            # (instead of once per column mapping) by the pool initializer
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_value_matching_worker,
+                initargs=(context,),
+            ) as pool:
+                unique_results = list(
+                    pool.map(_match_column_values_in_worker, unique_tasks)
+                )
+
+    # 3. Fan the results out to the mappings of each group
+    mapping_results: List[ValueMatchingResult] = [
+        {**unique_results[index], "source": source_column, "target": target_column}
+        for (source_column, target_column, _), index in zip(tasks, task_indexes)
+    ]
+
+    mapping_df_list = [
+        _value_matching_result_to_df(mapping_result)
+        for mapping_result in mapping_results
+    ]
+
+    return mapping_df_list
 
-        # 3. Apply the value matcher to create value mapping dictionaries
-        raw_matches = value_matcher.match(
-            list(source_values_dict.keys()), list(target_values_dict.keys())
+
+class _ValueMatchingContext(NamedTuple):
+    """
+    The settings of a _match_values() call that are shared by all the column
+    mappings (and sent once to each worker process).
+    """
+
+    value_matcher: BaseValueMatcher
+    # The stripped target values of each target column, mapped to the originals
+    target_values_dicts: Dict[str, Dict[str, Any]]
+    store: Optional[ValueMatchStore]
+    matcher_key: str
+    exact_match: bool
+
+
+def _match_column_values(
+    context: _ValueMatchingContext,
+    source_column: str,
+    target_column: str,
+    unique_values: np.ndarray,
+) -> ValueMatchingResult:
+    store = context.store
+    target_values_dict = context.target_values_dicts[target_column]
+
+    # Remove blank spaces to the unique values
+    source_values_dict: Dict[str, Any] = {str(x).strip(): x for x in unique_values}
+    missing_values = list(source_values_dict.keys())
+
+    # Resolve the values that are equal to a target value (up to case and
+    # whitespace) with a hash lookup, the rest are sent to the value matcher
+    exact_matches: List[ValueMatch] = []
+    if context.exact_match:
+        exact_matches = ExactValueMatcher().match(
+            missing_values, list(target_values_dict.keys())
+        )
+        exact_values = {match.source_value for match in exact_matches}
+        missing_values = [x for x in missing_values if x not in exact_values]
+
+    # Look up the values in the memo store, if any, so that only the missing
+    # values are sent to the value matcher
+    stored_matches: Dict[str, RankedMatches] = {}
+    if store is not None:
+        domain_key = get_domain_key(target_column, list(target_values_dict.keys()))
+        stored_matches = store.get(context.matcher_key, domain_key, missing_values)
+        missing_values = [x for x in missing_values if x not in stored_matches]
+
+    # Apply the value matcher to create value mapping dictionaries
+    raw_matches: Union[List[ValueMatch], ValueMatches] = []
+    if len(missing_values) > 0:
+        raw_matches = context.value_matcher.match(
+            missing_values, list(target_values_dict.keys())
         )
 
-        # 4. Transform the matches to the original
-        matches: List[ValueMatch] = []
+    if store is not None:
+        new_matches: Dict[str, RankedMatches] = {x: [] for x in missing_values}
+        for source_value, target_value, similarity in raw_matches:
+            new_matches[source_value].append((target_value, float(similarity)))
+        store.put(context.matcher_key, domain_key, new_matches)
+
+    # Merge the matches of the exact pre-pass, the store and the value matcher
+    if len(exact_matches) > 0 or len(stored_matches) > 0:
+        raw_matches = ValueMatches.concatenate(
+            [
+                exact_matches,
+                raw_matches,
+                [
+                    ValueMatch(source_value, target_value, similarity)
+                    for source_value, ranked_matches in stored_matches.items()
+                    for target_value, similarity in ranked_matches
+                ],
+            ]
+        )
+
+    # Transform the matches to the original
+    matches: Union[List[ValueMatch], ValueMatches]
+    if isinstance(raw_matches, ValueMatches):
+        matches = ValueMatches(
+            pd.Series(raw_matches.source_values, dtype=object)
+            .map(source_values_dict)
+            .to_numpy(dtype=object),
+            pd.Series(raw_matches.target_values, dtype=object)
+            .map(target_values_dict)
+            .to_numpy(dtype=object),
+            raw_matches.similarities,
+        )
+        match_values = set(matches.source_values)
+    else:
+        matches = []
         for source_value, target_value, similarity in raw_matches:
             matches.append(
                 ValueMatch(
@@ -377,29 +667,39 @@ def _match_values(
                     similarity=similarity,
                 )
             )
-
-        # 5. Calculate the coverage and unmatched values
-        source_values = set(source_values_dict.values())
         match_values = set([x[0] for x in matches])
-        coverage = len(match_values) / len(source_values_dict)
-
-        mapping_results.append(
-            ValueMatchingResult(
-                source=source_column,
-                target=target_column,
-                matches=matches,
-                coverage=coverage,
-                unique_values=source_values,
-                unmatch_values=source_values - match_values,
-            )
-        )
 
-    mapping_df_list = [
-        _value_matching_result_to_df(mapping_result)
-        for mapping_result in mapping_results
-    ]
+    # Calculate the coverage and unmatched values
+    source_values = set(source_values_dict.values())
+    coverage = len(match_values) / len(source_values_dict)
+
+    return ValueMatchingResult(
+        source=source_column,
+        target=target_column,
+        matches=matches,
+        coverage=coverage,
+        unique_values=source_values,
+        unmatch_values=source_values - match_values,
+        memo_hits=len(stored_matches) if store is not None else None,
+        memo_misses=len(missing_values) if store is not None else None,
+    )
+
+
+# The settings of the worker processes of _match_values, set once per process
+# by _init_value_matching_worker
+_worker_context: Optional[_ValueMatchingContext] = None
+
+
+def _init_value_matching_worker(context: _ValueMatchingContext):
+    global _worker_context
+    _worker_context = context
 
-    return mapping_df_list
+
+def _match_column_values_in_worker(
+    task: Tuple[str, str, np.ndarray]
+) -> ValueMatchingResult:
+    assert _worker_context is not None
+    return _match_column_values(_worker_context, *task)
 
 
 def _format_value_matching_input(
@@ -460,10 +760,20 @@ def _value_matching_result_to_df(
     """
     Transforms the list of matches and unmatched values into a DataFrame.
     """
-    matches_df = pd.DataFrame(
-        data=matching_result["matches"],
-        columns=["source", "target", "similarity"],
-    )
+    matches = matching_result["matches"]
+    if isinstance(matches, ValueMatches):
+        matches_df = pd.DataFrame(
+            {
+                "source": matches.source_values,
+                "target": matches.target_values,
+                "similarity": matches.similarities,
+            }
+        )
+    else:
+        matches_df = pd.DataFrame(
+            data=matches,
+            columns=["source", "target", "similarity"],
+        )
 
     unmatched_values = matching_result["unmatch_values"]
 
@@ -482,6 +792,9 @@ def _value_matching_result_to_df(
     result.attrs["source"] = matching_result["source"]
     result.attrs["target"] = matching_result["target"]
     result.attrs["coverage"] = matching_result["coverage"]
+    if matching_result.get("memo_hits") is not None:
+        result.attrs["memo_hits"] = matching_result["memo_hits"]
+        result.attrs["memo_misses"] = matching_result["memo_misses"]
     return result
 
 
@@ -813,7 +1126,9 @@ def create_mapper(
 
             # This could be the a list of value matches (i.e., ValueMatch
             # or tuple(source, target)) provided by the user
-            if "matches" in input and isinstance(input["matches"], List):
+            if "matches" in input and isinstance(
+                input["matches"], (List, ValueMatches)
+            ):
                 return _create_mapper_from_value_matches(input["matches"])
 
             if "matches" in input and isinstance(input["matches"], pd.DataFrame):
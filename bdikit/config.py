@@ -1,10 +1,14 @@
 import os
-import torch
 
-os.environ["TOKENIZERS_PARALLELISM"] = "false"
+# Users may enable the parallelism of the tokenizers library explicitly, which
+# speeds up the batch tokenization of columns in ContrastiveLearningAPI
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
 
 
 BDIKIT_DEVICE: str = os.getenv("BDIKIT_DEVICE", default="cpu")
+BDIKIT_INFERENCE_BACKEND: str = os.getenv("BDIKIT_INFERENCE_BACKEND", default="eager")
+# Maximum number of models (e.g., ContrastiveLearningAPI instances) kept in memory
+BDIKIT_MAX_LOADED_MODELS: int = int(os.getenv("BDIKIT_MAX_LOADED_MODELS", default="2"))
 VALUE_MATCHING_THRESHOLD = 0.3
 DEFAULT_VALUE_MATCHING_METHOD = "tfidf"
 DEFAULT_SCHEMA_MATCHING_METHOD = "coma"
@@ -12,6 +16,12 @@ DEFAULT_SCHEMA_MATCHING_METHOD = "coma"
 
 def get_device() -> str:
     if BDIKIT_DEVICE == "auto":
+        import torch
+
         return "cuda" if torch.cuda.is_available() else "cpu"
     else:
         return BDIKIT_DEVICE
+
+
+def get_inference_backend() -> str:
+    return BDIKIT_INFERENCE_BACKEND
@@ -1,5 +1,6 @@
 import os
 import sys
+import shutil
 import requests
 from tqdm.auto import tqdm
 
@@ -18,6 +19,7 @@ BUILTIN_MODELS_BOX_URL = {
 }
 
 BDIKIT_EMBEDDINGS_CACHE_DIR = os.path.join(BDIKIT_CACHE_DIR, "embeddings")
+BDIKIT_STANDARDS_CACHE_DIR = os.path.join(BDIKIT_CACHE_DIR, "standards")
 
 
 def download_file_url(url: str, destination: str):
@@ -59,6 +61,36 @@ def get_cached_model_or_download(model_name: str):
     return model_path
 
 
+def get_cached_language_model(lm_name: str):
+    """
+    Returns the path of a local copy of the configuration and tokenizer files of
+    a HuggingFace language model (e.g., roberta-base). The files are downloaded
+    from the HuggingFace Hub to the bdikit cache on first use, so that models can
+    be later created fully offline. The pretrained weights are not stored, since
+    bdikit models load their weights from their own checkpoints.
+    """
+    lm_path = get_cache_file_path(lm_name)
+    if not os.path.exists(os.path.join(lm_path, "config.json")):
+        from transformers import AutoConfig, AutoTokenizer
+
+        print(f"Downloading {lm_name} configuration and tokenizer to {lm_path}")
+        # Save to a temporary directory first so that concurrent processes never
+        # load a partially written copy
+        tmp_path = f"{lm_path}.{os.getpid()}.tmp"
+        AutoTokenizer.from_pretrained(lm_name).save_pretrained(tmp_path)
+        AutoConfig.from_pretrained(lm_name).save_pretrained(tmp_path)
+        # A complete copy stored by another process in the meantime is kept,
+        # and the destination is never removed since it may be in use
+        if not os.path.exists(os.path.join(lm_path, "config.json")):
+            try:
+                os.rename(tmp_path, lm_path)
+            except OSError:
+                # another process renamed its copy to the destination first
+                pass
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    return lm_path
+
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Please provide a model_id as a command line argument.")
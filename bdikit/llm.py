@@ -0,0 +1,154 @@
+import json
+import time
+import random
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from os.path import join
+from typing import Any, Dict, List, Optional
+from bdikit.download import BDIKIT_CACHE_DIR
+from bdikit.utils import SQLiteCache
+
+BDIKIT_LLM_CACHE_PATH = join(BDIKIT_CACHE_DIR, "llm", "responses.sqlite")
+
+# A chat prompt, i.e., the list of messages sent to the chat completions API
+Messages = List[Dict[str, str]]
+
+
+def hash_prompt(messages: Messages, **request_kwargs: Any) -> str:
+    """Returns a digest of the prompt and the request arguments (e.g., temperature)."""
+    payload = json.dumps(
+        {"messages": messages, "kwargs": request_kwargs}, sort_keys=True
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMResponseCache(SQLiteCache):
+    """
+    Persistent cache of LLM responses, keyed by model and prompt hash, stored in
+    an SQLite database shared by all processes. Reruns of the same prompts are
+    answered from the cache instead of calling the API again.
+    """
+
+    schema = (
+        "CREATE TABLE IF NOT EXISTS responses ("
+        "model TEXT NOT NULL, "
+        "prompt_hash TEXT NOT NULL, "
+        "response TEXT NOT NULL, "
+        "PRIMARY KEY (model, prompt_hash))"
+    )
+
+    def __init__(self, path: str = BDIKIT_LLM_CACHE_PATH):
+        super().__init__(path)
+
+    def get(self, model: str, prompt_hash: str) -> Optional[str]:
+        rows = self._execute(
+            "SELECT response FROM responses WHERE model = ? AND prompt_hash = ?",
+            (model, prompt_hash),
+        )
+        return rows[0][0] if rows else None
+
+    def put(self, model: str, prompt_hash: str, response: str):
+        self._execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+            (model, prompt_hash, response),
+        )
+
+
+def _is_retryable(error: Exception) -> bool:
+    try:
+        import openai
+    except ImportError:
+        return False
+    return isinstance(
+        error,
+        (
+            openai.APIConnectionError,  # includes timeouts
+            openai.RateLimitError,
+            openai.InternalServerError,
+        ),
+    )
+
+
+def complete_with_retry(
+    client: Any,
+    model: str,
+    messages: Messages,
+    max_retries: int = 5,
+    initial_backoff: float = 1.0,
+    **request_kwargs: Any,
+) -> str:
+    """
+    Sends the prompt to the chat completions API of the (OpenAI-compatible)
+    client and returns the content of the response. Rate limit, connection and
+    server errors are retried up to `max_retries` times, with exponential
+    backoff and jitter.
+    """
+    attempt = 0
+    while True:
+        try:
+            completion = client.chat.completions.create(
+                model=model, messages=messages, **request_kwargs
+            )
+            return completion.choices[0].message.content
+        except Exception as e:
+            if attempt >= max_retries or not _is_retryable(e):
+                raise
+            backoff = initial_backoff * 2**attempt
+            time.sleep(backoff + random.uniform(0, backoff))
+            attempt += 1
+
+
+def complete_all(
+    client: Any,
+    model: str,
+    prompts: List[Messages],
+    max_workers: int = 8,
+    max_retries: int = 5,
+    initial_backoff: float = 1.0,
+    cache: Optional[LLMResponseCache] = None,
+    **request_kwargs: Any,
+) -> List[Optional[str]]:
+    """
+    Returns the responses to the prompts, in the same order. Prompts whose
+    responses are not in the cache are sent concurrently, with at most
+    `max_workers` requests in flight. The response of a prompt that still
+    failed with a transient error (see complete_with_retry) after all retries
+    is None. Other errors (e.g., authentication errors or bad requests) are
+    raised.
+    """
+    responses: List[Optional[str]] = [None] * len(prompts)
+    prompt_hashes = [hash_prompt(prompt, **request_kwargs) for prompt in prompts]
+
+    missing = []
+    for i, prompt_hash in enumerate(prompt_hashes):
+        cached = cache.get(model, prompt_hash) if cache is not None else None
+        if cached is not None:
+            responses[i] = cached
+        else:
+            missing.append(i)
+
+    def complete(i: int) -> Optional[str]:
+        try:
+            response = complete_with_retry(
+                client,
+                model,
+                prompts[i],
+                max_retries=max_retries,
+                initial_backoff=initial_backoff,
+                **request_kwargs,
+            )
+        except Exception as e:
+            if not _is_retryable(e):
+                raise
+            print(f"Error requesting a completion from {model}: {e}")
+            return None
+        if cache is not None and response is not None:
+            cache.put(model, prompt_hashes[i], response)
+        return response
+
+    if len(missing) > 0:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            for i, response in zip(missing, executor.map(complete, missing)):
+                responses[i] = response
+
+    return responses
@@ -1,7 +1,7 @@
 from abc import ABCMeta, abstractmethod
-from typing import List
 import pandas as pd
 import numpy as np
+from bdikit.standards.target_schema import TargetTable
 
 
 class ColumnEmbedder(metaclass=ABCMeta):
@@ -11,10 +11,11 @@ class ColumnEmbedder(metaclass=ABCMeta):
     """
 
     @abstractmethod
-    def get_embeddings(self, table: pd.DataFrame) -> List[np.ndarray]:
+    def get_embeddings(self, table: TargetTable) -> np.ndarray:
         """
         Must compute a vector embedding for each column in the table.
-        The vectors must be represented as dense np.ndarray vectors and
-        appear in the same order they appear in the DataFrame `table`.
+        The vectors must be returned as a dense np.ndarray matrix of shape
+        (n_columns, dim), with rows in the same order as the columns appear
+        in `table` (a DataFrame or a TargetSchema).
         """
         pass
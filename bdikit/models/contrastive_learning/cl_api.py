@@ -1,5 +1,9 @@
-from typing import List, Dict, Tuple, Optional
-from bdikit.config import get_device
+import os
+import queue
+import hashlib
+import threading
+from typing import Callable, List, Dict, Tuple, Optional
+from bdikit.config import get_device, get_inference_backend
 import numpy as np
 import pandas as pd
 import torch
@@ -9,11 +13,27 @@ from bdikit.models.contrastive_learning.cl_models import (
 from bdikit.models.contrastive_learning.cl_pretrained_dataset import (
     PretrainTableDataset,
 )
+from bdikit.models.contrastive_learning.cl_inference import (
+    INFERENCE_BACKENDS,
+    ColumnEncoder,
+    create_eager_encoder,
+    create_torchscript_encoder,
+    create_onnx_encoder,
+)
 from sklearn.metrics.pairwise import cosine_similarity
 from tqdm.auto import tqdm
-from bdikit.download import get_cached_model_or_download
-from bdikit.utils import check_embedding_cache, write_embeddings_to_cache
+from bdikit.download import get_cached_model_or_download, get_cache_file_path
+from bdikit.utils import (
+    hash_dataframe,
+    check_embedding_cache,
+    write_embeddings_to_cache,
+    load_standard_embeddings,
+    write_standard_embeddings,
+)
 from bdikit.models import ColumnEmbedder
+from bdikit.models.registry import MODEL_REGISTRY
+from bdikit.standards.standard_factory import Standards
+from bdikit.standards.target_schema import TargetSchema, TargetTable
 
 
 DEFAULT_CL_MODEL = "bdi-cl-v0.2"
@@ -25,7 +45,31 @@ class ContrastiveLearningAPI(ColumnEmbedder):
         model_path: Optional[str] = None,
         model_name: Optional[str] = None,
         batch_size: int = 128,
+        batch_tokens: Optional[int] = None,
+        fingerprint: Callable[[pd.DataFrame], str] = hash_dataframe,
+        backend: Optional[str] = None,
+        quantize: bool = False,
     ):
+        """
+        Args:
+            model_path (str, optional): Path to a model checkpoint.
+            model_name (str, optional): Name of a builtin model, which is
+                downloaded to the bdikit cache if needed.
+            batch_size (int, optional): Maximum number of columns per batch.
+            batch_tokens (int, optional): Maximum number of tokens per batch,
+                including padding. Columns of similar length are batched together
+                to use this budget. Defaults to `batch_size` times the maximum
+                sequence length.
+            fingerprint (Callable[[pd.DataFrame], str], optional): Function used
+                to compute the embedding cache key of each (sampled) column.
+            backend (str, optional): The inference backend used to run the model:
+                "eager" (PyTorch), "torchscript" (traced and frozen module) or
+                "onnx" (ONNX Runtime on CPU, requires the onnxruntime package).
+                Defaults to the value of the BDIKIT_INFERENCE_BACKEND environment
+                variable, or "eager" if it is not set.
+            quantize (bool, optional): Whether to apply dynamic int8 quantization
+                to the linear layers of the model. Only supported on CPU.
+        """
         if model_name and model_path:
             raise ValueError(
                 "Only one of model_name or model_path should be provided "
@@ -39,30 +83,127 @@ class ContrastiveLearningAPI(ColumnEmbedder):
         else:
             raise ValueError("Either model_name or model_path must be provided")
 
+        if backend is None:
+            backend = get_inference_backend()
+        if backend not in INFERENCE_BACKENDS:
+            raise ValueError(
+                f"The {backend} inference backend is not supported. "
+                f"Supported backends are: {', '.join(INFERENCE_BACKENDS)}"
+            )
+        self.backend = backend
+        self.quantize = quantize
+
         self.unlabeled = PretrainTableDataset()
         self.batch_size = batch_size
-        self.device = get_device()
-        self.model = self.load_checkpoint()
+        if batch_tokens is None:
+            batch_tokens = batch_size * self.unlabeled.max_len
+        self.batch_tokens = batch_tokens
+        self.fingerprint = fingerprint
+        # ONNX Runtime is only used with the CPU execution provider
+        self.device = "cpu" if backend == "onnx" else get_device()
+        if quantize and self.device != "cpu":
+            raise ValueError("Quantization is only supported on CPU devices")
+
+        # Identifies the embeddings computed by this model in the caches
+        self.model_id = os.path.basename(self.model_path)
+        if quantize:
+            self.model_id += "-int8"
+        model = self.load_checkpoint()
+        self.embedding_dim: int = model.projector.out_features
+        self.encoder = self.create_encoder(model)
+        # Only the eager encoder shares the modules of the PyTorch model, the
+        # other backends (and quantized encoders) run their own weights, so the
+        # fp32 model is released
+        self.model: Optional[BarlowTwinsSimCLR] = (
+            model if backend == "eager" and not quantize else None
+        )
 
     def load_checkpoint(self, lm: str = "roberta"):
         ckpt = torch.load(self.model_path, map_location=torch.device("cpu"))
         scale_loss = 0.1
         lambd = 3.9
-        model = BarlowTwinsSimCLR(scale_loss, lambd, device=self.device, lm=lm)
+        model = BarlowTwinsSimCLR(
+            scale_loss, lambd, device=self.device, lm=lm, pretrained=False
+        )
         model = model.to(self.device)
         model.load_state_dict(ckpt["model"])
 
         return model
 
-    def get_embeddings(self, table: pd.DataFrame) -> List[np.ndarray]:
+    def _checkpoint_digest(self) -> str:
+        """
+        Returns a digest of the size and modification time of the checkpoint,
+        which identifies the files derived from it (e.g., the ONNX export).
+        """
+        stat = os.stat(self.model_path)
+        version = f"{stat.st_size}:{stat.st_mtime_ns}"
+        return hashlib.sha256(version.encode()).hexdigest()[:16]
+
+    def create_encoder(self, model: BarlowTwinsSimCLR) -> ColumnEncoder:
+        if self.backend == "torchscript":
+            return create_torchscript_encoder(model, self.device, self.quantize)
+        elif self.backend == "onnx":
+            model_name = os.path.basename(self.model_path)
+            onnx_path = get_cache_file_path(
+                f"{model_name}-{self._checkpoint_digest()}.onnx"
+            )
+            return create_onnx_encoder(model, onnx_path, self.quantize)
+        else:
+            return create_eager_encoder(model, self.quantize)
+
+    def get_embeddings(self, table: TargetTable) -> np.ndarray:
+        if "standard" in table.attrs and "standard_version" in table.attrs:
+            return self._load_standard_embeddings(table)
         return self._load_table_tokens(table)
 
+    def _load_standard_embeddings(self, table: TargetTable) -> np.ndarray:
+        """
+        Loads the embeddings of the columns of a standard (e.g., GDC) from the
+        persistent store, which holds the embeddings of all columns of the
+        standard for each model and standard version. The store is created on
+        the first call, so the columns of the standard are embedded only once.
+        """
+        model_name = self.model_id
+        standard_name = table.attrs["standard"]
+        standard_version = table.attrs["standard_version"]
+
+        stored = load_standard_embeddings(model_name, standard_name, standard_version)
+        if stored is None:
+            standard = Standards.get_standard(standard_name)
+            if standard.get_version() != standard_version:
+                # The table does not come from the installed standard release
+                return self._load_table_tokens(table)
+            if set(table.columns) == set(standard.get_columns()):
+                standard_table = table
+            else:
+                standard_table = standard.get_target_schema()
+            embeddings = self._load_table_tokens(standard_table)
+            write_standard_embeddings(
+                model_name,
+                standard_name,
+                standard_version,
+                list(standard_table.columns),
+                embeddings,
+            )
+            stored = load_standard_embeddings(
+                model_name, standard_name, standard_version
+            )
+            assert stored is not None
+
+        matrix, column_index = stored
+        if not all(column in column_index for column in table.columns):
+            return self._load_table_tokens(table)
+
+        print(f"Table features loaded for {len(table.columns)} columns")
+        rows = [column_index[column] for column in table.columns]
+        return np.asarray(matrix[rows])
+
     def get_recommendations(
         self, table: pd.DataFrame, target: pd.DataFrame, top_k: int = 10
     ) -> Tuple[List, List[Dict]]:
 
-        l_features = self._load_table_tokens(table)
-        r_features = self._load_table_tokens(target)
+        l_features = self.get_embeddings(table)
+        r_features = self.get_embeddings(target)
         cosine_sim = cosine_similarity(l_features, r_features)
 
         # print(f"l_features - {len(l_features)}:{l_features[0].shape}\nr-feature - {len(r_features)}:{r_features[0].shape}\nCosine - {cosine_sim.shape}")
@@ -105,48 +246,192 @@ class ContrastiveLearningAPI(ColumnEmbedder):
                 table = unique_rows.sample(n=15, random_state=1)
         return table
 
-    def _load_table_tokens(self, table: pd.DataFrame) -> List[np.ndarray]:
-
-        embedding_file, embeddings = check_embedding_cache(table, self.model_path)
+    def _column_table(self, table: TargetTable, column: str) -> pd.DataFrame:
+        if isinstance(table, TargetSchema):
+            # Use the column as it appears in the padded DataFrame representation
+            # of the schema, so that embeddings (and their cache keys) do not
+            # depend on the representation of the target
+            return pd.DataFrame(table.get_padded_column(column))
+        return pd.DataFrame(table[column])
 
-        if embeddings != None:
-            print(f"Table features loaded for {len(table.columns)} columns")
-            return embeddings
-
-        print(f"Extracting features from {len(table.columns)} columns...")
+    def _load_table_tokens(self, table: TargetTable) -> np.ndarray:
         tables = []
-        for _, column in enumerate(table.columns):
-            curr_table = pd.DataFrame(table[column])
+        for column in table.columns:
+            curr_table = self._column_table(table, column)
             curr_table = self._sample_to_15_rows(curr_table)
             tables.append(curr_table)
-        vectors = self._inference_on_tables(tables)
-        embeddings = [vec[-1] for vec in vectors]
 
-        if embedding_file != None:
-            write_embeddings_to_cache(embedding_file, embeddings)
+        # Columns are cached individually, keyed by a fingerprint of the column
+        # name and the sampled rows, so only new or changed columns are embedded
+        keys = [self.fingerprint(curr_table) for curr_table in tables]
+        cached_embeddings = check_embedding_cache(keys, self.model_id)
+        missing = [i for i, key in enumerate(keys) if key not in cached_embeddings]
+
+        if len(missing) < len(keys):
+            print(f"Table features loaded for {len(keys) - len(missing)} columns")
 
+        if len(missing) > 0:
+            print(f"Extracting features from {len(missing)} columns...")
+            new_embeddings = self._inference_on_tables([tables[i] for i in missing])
+            write_embeddings_to_cache(
+                [keys[i] for i in missing],
+                new_embeddings,
+                self.model_id,
+                columns=[table.columns[i] for i in missing],
+            )
+            for i, embedding in zip(missing, new_embeddings):
+                cached_embeddings[keys[i]] = embedding
+
+        embeddings = np.empty((len(keys), self.embedding_dim), np.float32)
+        for i, key in enumerate(keys):
+            embeddings[i] = cached_embeddings[key]
         return embeddings
 
-    def _inference_on_tables(self, tables: List[pd.DataFrame]) -> List[List]:
-        total = len(tables)
-        batch = []
-        results = []
+    def _make_batches(self, lengths: List[int]) -> List[List[int]]:
+        """
+        Groups sequences of similar length into batches. Sequences are sorted
+        by length and added to a batch while the padded batch size (number of
+        sequences times the longest sequence) fits in the token budget and the
+        batch has at most `batch_size` sequences.
+        """
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+        batches: List[List[int]] = []
+        batch: List[int] = []
+        for i in order:
+            # sequences are sorted, so the current one is the longest of the batch
+            padded_size = (len(batch) + 1) * max(lengths[i], 1)
+            if batch and (
+                len(batch) == self.batch_size or padded_size > self.batch_tokens
+            ):
+                batches.append(batch)
+                batch = []
+            batch.append(i)
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _tokenize_batches(
+        self, tables: List[pd.DataFrame], batch_queue: queue.Queue
+    ) -> None:
+        """
+        Producer of the inference pipeline: tokenizes the tables in chunks and
+        puts the resulting batches of (table indexes, token ids) in the queue,
+        followed by None. Errors are forwarded to the consumer via the queue.
+
+        Tables are serialized first and tokenized in the order of the length
+        of their serialization, so that each chunk holds sequences of similar
+        length and the batches of all chunks need little padding (as if all
+        sequences were sorted at once).
+        """
+        try:
+            serialized = self.unlabeled.serialize_tables(tables)
+            order = sorted(
+                range(len(tables)),
+                key=lambda i: sum(len(text) for text in serialized[i][0]),
+            )
+            # chunks span several batches, so that sequences whose number of
+            # tokens is not in the order of their length are still bucketed
+            chunk_size = max(1, 8 * self.batch_size)
+            for start in range(0, len(order), chunk_size):
+                chunk = order[start : start + chunk_size]
+                tokens = self.unlabeled.tokenize_serialized(
+                    [serialized[i] for i in chunk]
+                )
+                for batch in self._make_batches([len(x) for x in tokens]):
+                    batch_queue.put(
+                        ([chunk[i] for i in batch], [tokens[i] for i in batch])
+                    )
+            batch_queue.put(None)
+        except BaseException as e:
+            batch_queue.put(e)
+
+    def _inference_on_tables(self, tables: List[pd.DataFrame]) -> np.ndarray:
+        """
+        Computes the embedding of each table, i.e., the vector of the last
+        column of the serialized table. Returns a (n_tables, dim) matrix.
 
-        for tid, table in tqdm(enumerate(tables), total=total):
-            x, _ = self.unlabeled._tokenize(table)
-            batch.append((x, x, []))
+        Tables are tokenized in a background thread while the model runs on
+        the batches that are already tokenized.
+        """
+        cls_token_id = self.unlabeled.tokenizer.cls_token_id
+        results = np.empty((len(tables), self.embedding_dim), dtype=np.float32)
 
-            if tid == total - 1 or len(batch) == self.batch_size:
+        # The queue is bounded so that the producer waits for the model instead
+        # of keeping the tokens of all the tables in memory
+        batch_queue: queue.Queue = queue.Queue(maxsize=2)
+        producer = threading.Thread(
+            target=self._tokenize_batches, args=(tables, batch_queue), daemon=True
+        )
+        producer.start()
+
+        with tqdm(total=len(tables)) as progress_bar:
+            while True:
+                item = batch_queue.get()
+                if item is None:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                batch, tokens = item
                 with torch.no_grad():
-                    x, _, _ = self.unlabeled.pad(batch)
-                    column_vectors = self.model.inference(x)
-                    ptr = 0
-                    for xi in x:
-                        current = []
-                        for token_id in xi:
-                            if token_id == self.unlabeled.tokenizer.cls_token_id:
-                                current.append(column_vectors[ptr].cpu().numpy())
-                                ptr += 1
-                        results.append(current)
-                batch.clear()
+                    x, attention_mask = self.unlabeled.pad_with_mask(tokens)
+                    z = self.encoder(x.to(self.device), attention_mask.to(self.device))
+                    # position of the last CLS token of each sequence
+                    positions = torch.arange(x.shape[1]).expand_as(x)
+                    last_cls = torch.where(x == cls_token_id, positions, 0).amax(1)
+                    last_vectors = z[torch.arange(len(x)), last_cls.to(z.device)]
+                    results[batch] = last_vectors.cpu().numpy()
+                progress_bar.update(len(batch))
+
+        producer.join()
         return results
+
+
+def _registry_key(
+    model_name: Optional[str],
+    model_path: Optional[str],
+    backend: Optional[str],
+    quantize: bool,
+) -> Tuple:
+    if backend is None:
+        backend = get_inference_backend()
+    device = "cpu" if backend == "onnx" else get_device()
+    return (model_name or model_path, device, backend, quantize)
+
+
+def get_cl_model(
+    model_name: Optional[str] = None,
+    model_path: Optional[str] = None,
+    backend: Optional[str] = None,
+    quantize: bool = False,
+) -> ContrastiveLearningAPI:
+    """
+    Returns the ContrastiveLearningAPI instance for the given model, device and
+    inference backend, shared by all matchers of the process. The model is
+    loaded on the first call and kept in the process-wide model registry
+    (see bdikit.models.registry.MODEL_REGISTRY) until it is evicted or unloaded.
+    Arguments are the same as in the ContrastiveLearningAPI constructor.
+    """
+    key = _registry_key(model_name, model_path, backend, quantize)
+    return MODEL_REGISTRY.get(
+        key,
+        lambda: ContrastiveLearningAPI(
+            model_path=model_path,
+            model_name=model_name,
+            backend=backend,
+            quantize=quantize,
+        ),
+    )
+
+
+def unload_cl_model(
+    model_name: Optional[str] = None,
+    model_path: Optional[str] = None,
+    backend: Optional[str] = None,
+    quantize: bool = False,
+) -> bool:
+    """
+    Removes the model loaded by get_cl_model() with the same arguments from the
+    model registry. Returns whether the model was loaded.
+    """
+    key = _registry_key(model_name, model_path, backend, quantize)
+    return MODEL_REGISTRY.unload(key)
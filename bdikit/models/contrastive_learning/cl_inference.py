@@ -0,0 +1,160 @@
+import os
+import inspect
+import warnings
+import torch
+import torch.nn as nn
+from torch.ao.quantization import quantize_dynamic
+from typing import Callable
+from bdikit.models.contrastive_learning.cl_models import BarlowTwinsSimCLR
+
+INFERENCE_BACKENDS = ["eager", "torchscript", "onnx"]
+
+# Column encoders map a batch of token ids of shape (batch_size, seq_len) and
+# the respective attention mask to the projected token vectors of shape
+# (batch_size, seq_len, projector_size)
+ColumnEncoder = Callable[[torch.Tensor, torch.Tensor], torch.Tensor]
+
+
+class EncoderModule(nn.Module):
+    """The part of BarlowTwinsSimCLR used for inference: the LM and the projector."""
+
+    def __init__(self, model: BarlowTwinsSimCLR):
+        super().__init__()
+        self.bert = model.bert
+        self.projector = model.projector
+
+    def forward(self, x, attention_mask):
+        z = self.bert(x, attention_mask=attention_mask, return_dict=False)[0]
+        return self.projector(z)
+
+
+def _example_inputs(device: str):
+    # use different lengths per row so that the mask is not constant-folded
+    x = torch.full((2, 8), 2, dtype=torch.long, device=device)
+    attention_mask = torch.ones((2, 8), dtype=torch.long, device=device)
+    attention_mask[1, 5:] = 0
+    return x, attention_mask
+
+
+def _quantize_encoder(encoder: EncoderModule) -> nn.Module:
+    """Applies dynamic int8 quantization to the linear layers of the encoder,
+    i.e., those of the LM and the projector. Layers are replaced in place, so
+    the fp32 weights are not copied."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return quantize_dynamic(encoder, {nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def create_eager_encoder(
+    model: BarlowTwinsSimCLR, quantize: bool = False
+) -> ColumnEncoder:
+    encoder = EncoderModule(model).eval()
+    if quantize:
+        return _quantize_encoder(encoder)
+    return encoder
+
+
+def create_torchscript_encoder(
+    model: BarlowTwinsSimCLR, device: str, quantize: bool = False
+) -> ColumnEncoder:
+    encoder = EncoderModule(model).eval()
+    if quantize:
+        encoder = _quantize_encoder(encoder)
+    with torch.no_grad(), warnings.catch_warnings():
+        # tracer warnings about constants in the attention mask code (and the
+        # deprecation warnings of torch.jit in recent versions) are expected
+        warnings.simplefilter("ignore")
+        traced = torch.jit.trace(encoder, _example_inputs(device), check_trace=False)
+        return torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+
+
+class ONNXEncoder:
+    """Runs the column encoder exported to ONNX using ONNX Runtime on CPU."""
+
+    def __init__(self, onnx_path: str):
+        try:
+            import onnxruntime
+        except ImportError:
+            raise ImportError(
+                "The 'onnx' inference backend requires the onnxruntime package. "
+                "Install it with: pip install bdi-kit[onnx]"
+            )
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = (
+            onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        )
+        self.session = onnxruntime.InferenceSession(
+            onnx_path, options, providers=["CPUExecutionProvider"]
+        )
+
+    def __call__(self, x: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        (z,) = self.session.run(
+            ["z"],
+            {
+                "input_ids": x.cpu().numpy(),
+                "attention_mask": attention_mask.cpu().numpy(),
+            },
+        )
+        return torch.from_numpy(z)
+
+
+def export_onnx_encoder(model: BarlowTwinsSimCLR, onnx_path: str):
+    encoder = EncoderModule(model).cpu().eval()
+    os.makedirs(os.path.dirname(onnx_path), exist_ok=True)
+    # Export to a temporary file first so that concurrent processes never load
+    # a partially written model
+    tmp_path = f"{onnx_path}.{os.getpid()}.tmp"
+    # torch>=2.5 can also export with dynamo, the TorchScript exporter is used
+    # since it supports the dynamic axes of the encoder in all versions
+    export_kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        export_kwargs["dynamo"] = False
+    with torch.no_grad(), warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        torch.onnx.export(
+            encoder,
+            _example_inputs("cpu"),
+            tmp_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["z"],
+            dynamic_axes={
+                "input_ids": {0: "batch_size", 1: "seq_len"},
+                "attention_mask": {0: "batch_size", 1: "seq_len"},
+                "z": {0: "batch_size", 1: "seq_len"},
+            },
+            opset_version=17,
+            **export_kwargs,
+        )
+    os.replace(tmp_path, onnx_path)
+
+
+def quantize_onnx_encoder(onnx_path: str, quantized_path: str):
+    try:
+        from onnxruntime.quantization import quantize_dynamic as quantize_onnx
+        from onnxruntime.quantization import QuantType
+    except ImportError:
+        raise ImportError(
+            "The 'onnx' inference backend requires the onnxruntime package. "
+            "Install it with: pip install bdi-kit[onnx]"
+        )
+    tmp_path = f"{quantized_path}.{os.getpid()}.tmp"
+    quantize_onnx(onnx_path, tmp_path, weight_type=QuantType.QInt8)
+    os.replace(tmp_path, quantized_path)
+
+
+def create_onnx_encoder(
+    model: BarlowTwinsSimCLR, onnx_path: str, quantize: bool = False
+) -> ColumnEncoder:
+    """
+    Creates an encoder that runs the model exported to `onnx_path`, which is
+    exported first if the file does not exist. When `quantize` is set, the
+    quantized model is stored next to the exported model and used instead.
+    """
+    if not os.path.exists(onnx_path):
+        export_onnx_encoder(model, onnx_path)
+    if quantize:
+        quantized_path = onnx_path[: -len(".onnx")] + "-int8.onnx"
+        if not os.path.exists(quantized_path):
+            quantize_onnx_encoder(onnx_path, quantized_path)
+        onnx_path = quantized_path
+    return ONNXEncoder(onnx_path)
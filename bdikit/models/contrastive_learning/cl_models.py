@@ -1,7 +1,10 @@
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
-from transformers import AutoModel, AutoTokenizer, logging
+from transformers import AutoConfig, AutoModel, logging
+from transformers.modeling_utils import no_init_weights
+from bdikit.download import get_cached_language_model
+from bdikit.models.contrastive_learning.cl_pretrained_dataset import get_tokenizer
 
 # Suppress the warning messages about untrained layer when loading the roberta  model
 # in line: self.bert = AutoModel.from_pretrained(lm_mp[lm])
@@ -13,9 +16,24 @@ lm_mp = {"roberta": "roberta-base", "distilbert": "distilbert-base-uncased"}
 class BarlowTwinsSimCLR(nn.Module):
     """Barlow Twins or SimCLR encoder for contrastive learning."""
 
-    def __init__(self, scale_loss, lambd, projector=768, device="cuda", lm="roberta"):
+    def __init__(
+        self,
+        scale_loss,
+        lambd,
+        projector=768,
+        device="cuda",
+        lm="roberta",
+        pretrained=True,
+    ):
         super().__init__()
-        self.bert = AutoModel.from_pretrained(lm_mp[lm])
+        if pretrained:
+            self.bert = AutoModel.from_pretrained(lm_mp[lm])
+        else:
+            # The weights are loaded from a checkpoint afterwards, so the model
+            # is only built from its configuration, skipping weight initialization
+            config = AutoConfig.from_pretrained(get_cached_language_model(lm_mp[lm]))
+            with no_init_weights():
+                self.bert = AutoModel.from_config(config)
         self.device = device
         self.scale_loss = scale_loss
         self.lambd = lambd
@@ -34,7 +52,7 @@ class BarlowTwinsSimCLR(nn.Module):
         self.criterion = nn.CrossEntropyLoss().to(device)
 
         # cls token id
-        self.cls_token_id = AutoTokenizer.from_pretrained(lm_mp[lm]).cls_token_id
+        self.cls_token_id = get_tokenizer(lm).cls_token_id
 
     def info_nce_loss(self, features, batch_size, n_views, temperature=0.07):
         """Copied from https://github.com/sthalles/SimCLR/blob/master/simclr.py"""
@@ -74,11 +92,7 @@ class BarlowTwinsSimCLR(nn.Module):
         column_vectors = z.view((x_flat.shape[0], -1))
 
         if cls_indices is None:
-            indices = [
-                idx
-                for idx, token_id in enumerate(x_flat)
-                if token_id == self.cls_token_id
-            ]
+            indices = (x_flat == self.cls_token_id).nonzero(as_tuple=True)[0]
         else:
             indices = []
             seq_len = x.shape[-1]
@@ -87,17 +101,20 @@ class BarlowTwinsSimCLR(nn.Module):
 
         return column_vectors[indices]
 
-    def inference(self, x):
+    def inference(self, x, attention_mask=None):
         """Apply the model on a serialized table.
 
         Args:
             x (LongTensor): a batch of serialized tables
+            attention_mask (LongTensor, optional): the mask of the padding tokens
 
         Returns:
             Tensor: the column vectors for all tables
         """
         x = x.to(self.device)
-        z = self.bert(x)[0]
+        if attention_mask is not None:
+            attention_mask = attention_mask.to(self.device)
+        z = self.bert(x, attention_mask=attention_mask)[0]
         z = self.projector(z)  # optional
         return self._extract_columns(x, z)
 
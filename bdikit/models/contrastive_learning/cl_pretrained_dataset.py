@@ -1,10 +1,14 @@
 import pandas as pd
 import torch
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List, Tuple
 from bdikit.models.contrastive_learning.cl_preprocessor import (
     preprocess,
 )
 from torch.utils import data
-from transformers import AutoTokenizer
+from transformers import AutoTokenizer, PreTrainedTokenizerBase
+from bdikit.download import get_cached_language_model
 
 lm_mp = {
     "roberta": "roberta-base",
@@ -13,21 +17,35 @@ lm_mp = {
 }
 
 
+@lru_cache(maxsize=None)
+def get_tokenizer(lm: str = "roberta") -> PreTrainedTokenizerBase:
+    """Returns the tokenizer of the language model, which is loaded only once
+    per process from the bdikit cache."""
+    return AutoTokenizer.from_pretrained(get_cached_language_model(lm_mp[lm]))
+
+
 class PretrainTableDataset(data.Dataset):
     def __init__(self, max_len=128, lm="roberta", sample_meth="head"):
         super().__init__()
         self.max_len = max_len
-        self.tokenizer = AutoTokenizer.from_pretrained(lm_mp[lm])
+        self.tokenizer = get_tokenizer(lm)
         self.sample_meth = sample_meth
 
-    def _tokenize(self, table: pd.DataFrame):
-        res = []
+    def _serialize(self, table: pd.DataFrame) -> Tuple[List[str], int]:
+        """Serialize each column of a table into a string
+
+        Args:
+            table (DataFrame): the table to serialize
+
+        Returns:
+            List of str: the serialized columns
+            int: the maximum number of tokens of each serialized column
+        """
         max_tokens = self.max_len * 2 // len(table.columns)
         budget = max(1, self.max_len // len(table.columns) - 1)
         tfidfDict = None
 
-        column_mp = {}
-
+        texts = []
         for column in table.columns:
             tokens = preprocess(
                 table[column], tfidfDict, max_tokens, self.sample_meth
@@ -38,6 +56,15 @@ class PretrainTableDataset(data.Dataset):
                 + self.tokenizer.sep_token
                 + self.tokenizer.sep_token.join(tokens[:max_tokens])
             )
+            texts.append(col_text)
+        return texts, budget
+
+    def _tokenize(self, table: pd.DataFrame):
+        res = []
+        column_mp = {}
+
+        texts, budget = self._serialize(table)
+        for column, col_text in zip(table.columns, texts):
             column_mp[column] = len(res)
             res += self.tokenizer.encode(
                 text=col_text,
@@ -47,6 +74,72 @@ class PretrainTableDataset(data.Dataset):
             )
         return res, column_mp
 
+    def serialize_tables(
+        self, tables: List[pd.DataFrame]
+    ) -> List[Tuple[List[str], int]]:
+        """Serialize a list of tables (see _serialize())
+
+        Args:
+            tables (list of DataFrame): the tables to serialize
+
+        Returns:
+            list of tuple: the serialized columns and the token budget of each
+                column of each table
+        """
+        return [self._serialize(table) for table in tables]
+
+    def tokenize_tables(self, tables: List[pd.DataFrame]) -> List[List[int]]:
+        """Tokenize a list of tables at once
+
+        All tables are serialized first and then tokenized together using the
+        batch encoding of the tokenizer, which is much faster than encoding
+        each column separately when a fast tokenizer is available.
+
+        Args:
+            tables (list of DataFrame): the tables to tokenize
+
+        Returns:
+            list of list: the token ids of each table (same as _tokenize())
+        """
+        return self.tokenize_serialized(self.serialize_tables(tables))
+
+    def tokenize_serialized(
+        self, serialized: List[Tuple[List[str], int]]
+    ) -> List[List[int]]:
+        """Tokenize a list of tables serialized by serialize_tables()
+
+        Args:
+            serialized (list of tuple): the serialized tables
+
+        Returns:
+            list of list: the token ids of each table (same as _tokenize())
+        """
+        # the columns of tables with the same number of columns share a budget,
+        # so they can be encoded by the same call to the tokenizer
+        texts_by_budget: Dict[int, List[str]] = defaultdict(list)
+        for texts, budget in serialized:
+            texts_by_budget[budget].extend(texts)
+
+        encoded_by_budget = {
+            budget: iter(
+                self.tokenizer(
+                    texts,
+                    max_length=budget,
+                    add_special_tokens=False,
+                    truncation=True,
+                )["input_ids"]
+            )
+            for budget, texts in texts_by_budget.items()
+        }
+
+        results = []
+        for texts, budget in serialized:
+            res: List[int] = []
+            for _ in texts:
+                res += next(encoded_by_budget[budget])
+            results.append(res)
+        return results
+
     def pad(self, batch):
         """Merge a list of dataset items into a training batch
 
@@ -85,3 +178,21 @@ class PretrainTableDataset(data.Dataset):
             torch.LongTensor(x_aug_new),
             (cls_ori, cls_aug),
         )
+
+    def pad_with_mask(self, batch: List[List[int]]):
+        """Pad a list of sequences for inference
+
+        Args:
+            batch (list of list): a list of token id sequences
+
+        Returns:
+            LongTensor: x of shape (batch_size, seq_len)
+            LongTensor: the attention mask of shape (batch_size, seq_len)
+        """
+        maxlen = max(len(xi) for xi in batch)
+        x = torch.full((len(batch), maxlen), self.tokenizer.pad_token_id)
+        attention_mask = torch.zeros((len(batch), maxlen), dtype=torch.long)
+        for i, xi in enumerate(batch):
+            x[i, : len(xi)] = torch.LongTensor(xi)
+            attention_mask[i, : len(xi)] = 1
+        return x, attention_mask
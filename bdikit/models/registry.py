@@ -0,0 +1,70 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List
+from bdikit.config import BDIKIT_MAX_LOADED_MODELS
+
+
+class ModelRegistry:
+    """
+    Keeps loaded models in memory so that they can be shared by all matchers
+    of a process. Models are identified by a key, e.g., a tuple (model name,
+    device, backend), and are loaded on first use. When more than `max_models`
+    models are loaded, the least recently used ones are evicted.
+    """
+
+    def __init__(self, max_models: int = BDIKIT_MAX_LOADED_MODELS):
+        if max_models < 1:
+            raise ValueError("max_models must be at least 1")
+        self.max_models = max_models
+        self._models: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Returns the model registered with the given key. If the model is not
+        loaded yet, it is created by calling `loader()` and registered.
+        """
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key]
+
+            # Loading while holding the lock makes concurrent requests for the
+            # same model wait for it to be loaded once, instead of loading it
+            # several times
+            model = loader()
+            self._models[key] = model
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+            return model
+
+    def unload(self, key: Hashable) -> bool:
+        """
+        Removes the model from the registry, so that its memory can be freed
+        once it is no longer used by any matcher. Returns whether the model was
+        loaded.
+        """
+        with self._lock:
+            return self._models.pop(key, None) is not None
+
+    def clear(self):
+        """Removes all models from the registry."""
+        with self._lock:
+            self._models.clear()
+
+    def keys(self) -> List[Hashable]:
+        """Returns the keys of the loaded models, from least to most recently used."""
+        with self._lock:
+            return list(self._models.keys())
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._models
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._models)
+
+
+# The registry shared by all matchers of this process
+MODEL_REGISTRY = ModelRegistry()
@@ -1,9 +1,10 @@
 import pandas as pd
 from typing import Dict
+from bdikit.standards.target_schema import TargetTable
 
 
 class BaseSchemaMatcher:
-    def map(self, source: pd.DataFrame, target: pd.DataFrame) -> Dict[str, str]:
+    def map(self, source: pd.DataFrame, target: TargetTable) -> Dict[str, str]:
         raise NotImplementedError("Subclasses must implement this method")
 
     def _fill_missing_matches(
@@ -1,14 +1,23 @@
 import pandas as pd
+from typing import Optional
 from bdikit.schema_matching.one2one.base import BaseSchemaMatcher
 from bdikit.models.contrastive_learning.cl_api import DEFAULT_CL_MODEL
 from bdikit.schema_matching.topk.contrastivelearning import CLTopkSchemaMatcher
+from bdikit.standards.target_schema import TargetTable
 
 
 class ContrastiveLearningSchemaMatcher(BaseSchemaMatcher):
-    def __init__(self, model_name: str = DEFAULT_CL_MODEL):
-        self.topk_matcher = CLTopkSchemaMatcher(model_name=model_name)
+    def __init__(
+        self,
+        model_name: str = DEFAULT_CL_MODEL,
+        backend: Optional[str] = None,
+        quantize: bool = False,
+    ):
+        self.topk_matcher = CLTopkSchemaMatcher(
+            model_name=model_name, backend=backend, quantize=quantize
+        )
 
-    def map(self, source: pd.DataFrame, target: pd.DataFrame):
+    def map(self, source: pd.DataFrame, target: TargetTable):
         topk_matches = self.topk_matcher.get_recommendations(source, target, top_k=1)
         matches = {}
         for column, top_k_match in zip(source.columns, topk_matches):
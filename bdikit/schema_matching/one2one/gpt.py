@@ -1,37 +1,80 @@
 import pandas as pd
-from openai import OpenAI
+from typing import Any, List, Optional
 from bdikit.schema_matching.one2one.base import BaseSchemaMatcher
+from bdikit.standards.target_schema import TargetTable
+from bdikit.llm import (
+    LLMResponseCache,
+    BDIKIT_LLM_CACHE_PATH,
+    Messages,
+    complete_all,
+)
 
 
 class GPTSchemaMatcher(BaseSchemaMatcher):
-    def __init__(self):
-        self.client = OpenAI()
+    def __init__(
+        self,
+        model: str = "gpt-4-turbo-preview",
+        max_workers: int = 8,
+        max_retries: int = 5,
+        use_cache: bool = True,
+        cache_path: str = BDIKIT_LLM_CACHE_PATH,
+        random_state: int = 0,
+        client: Optional[Any] = None,
+    ):
+        """
+        Args:
+            model (str, optional): The name of the OpenAI model.
+            max_workers (int, optional): The maximum number of concurrent
+                requests (one per source column).
+            max_retries (int, optional): The number of times a request is
+                retried after a rate limit, connection or server error.
+            use_cache (bool, optional): Whether responses are stored in (and
+                reused from) a persistent cache keyed by model and prompt, i.e.,
+                by the column context and the target columns.
+            cache_path (str, optional): The path of the cache database.
+            random_state (int, optional): The seed used to sample the values of
+                each column, so that the same column always yields the same
+                context (and cached responses can be reused).
+            client (optional): An OpenAI-compatible client. Defaults to
+                openai.OpenAI().
+        """
+        if client is None:
+            from openai import OpenAI
+
+            client = OpenAI()
+        self.client = client
+        self.model = model
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.random_state = random_state
+        self.cache = LLMResponseCache(cache_path) if use_cache else None
 
-    def map(self, source: pd.DataFrame, target: pd.DataFrame):
+    def map(self, source: pd.DataFrame, target: TargetTable):
         target_columns = target.columns
         labels = ", ".join(target_columns)
-        candidate_columns = source.columns
+        candidate_columns = list(source.columns)
+        contexts = [self.get_context(source[column]) for column in candidate_columns]
+        column_types = self.get_column_types(contexts, labels)
+
         mappings = {}
-        for column in candidate_columns:
-            col = source[column]
-            values = col.drop_duplicates().dropna()
-            if len(values) > 15:
-                rows = values.sample(15).tolist()
-            else:
-                rows = values.tolist()
-            serialized_input = f"{column}: {', '.join([str(row) for row in rows])}"
-            context = serialized_input.lower()
-            column_types = self.get_column_type(context, labels)
-            for column_type in column_types:
+        for column, types in zip(candidate_columns, column_types):
+            for column_type in types:
                 if column_type in target_columns:
                     mappings[column] = column_type
                     break
         return self._fill_missing_matches(source, mappings)
 
-    def get_column_type(
-        self, context: str, labels: str, m: int = 10, model: str = "gpt-4-turbo-preview"
-    ):
-        messages = [
+    def get_context(self, col: pd.Series) -> str:
+        values = col.drop_duplicates().dropna()
+        if len(values) > 15:
+            rows = values.sample(15, random_state=self.random_state).tolist()
+        else:
+            rows = values.tolist()
+        serialized_input = f"{col.name}: {', '.join([str(row) for row in rows])}"
+        return serialized_input.lower()
+
+    def _create_prompt(self, context: str, labels: str, m: int = 10) -> Messages:
+        return [
             {"role": "system", "content": "You are an assistant for column matching."},
             {
                 "role": "user",
@@ -45,8 +88,38 @@ class GPTSchemaMatcher(BaseSchemaMatcher):
                 + """ \n RESPONSE: \n""",
             },
         ]
-        col_type = self.client.chat.completions.create(
-            model=model, messages=messages, temperature=0.3
+
+    def get_column_types(
+        self,
+        contexts: List[str],
+        labels: str,
+        m: int = 10,
+        model: Optional[str] = None,
+    ) -> List[List[str]]:
+        """
+        Returns the candidate target columns of each context, requested
+        concurrently (and reused from the cache when possible). The model
+        defaults to the one the matcher was created with.
+        """
+        responses = complete_all(
+            self.client,
+            model or self.model,
+            [self._create_prompt(context, labels, m) for context in contexts],
+            max_workers=self.max_workers,
+            max_retries=self.max_retries,
+            cache=self.cache,
+            temperature=0.3,
         )
-        col_type_content = col_type.choices[0].message.content
-        return col_type_content.split(";")
+        return [
+            (
+                [column_type.strip() for column_type in response.split(";")]
+                if response is not None
+                else []
+            )
+            for response in responses
+        ]
+
+    def get_column_type(
+        self, context: str, labels: str, m: int = 10, model: Optional[str] = None
+    ) -> List[str]:
+        return self.get_column_types([context], labels, m, model)[0]
@@ -6,6 +6,7 @@ from bdikit.schema_matching.topk.base import BaseTopkSchemaMatcher
 from bdikit.schema_matching.topk.contrastivelearning import CLTopkSchemaMatcher
 from bdikit.value_matching.polyfuzz import TFIDFValueMatcher
 from bdikit.value_matching.base import BaseValueMatcher
+from bdikit.standards.target_schema import TargetTable
 
 
 class MaxValSimSchemaMatcher(BaseSchemaMatcher):
@@ -47,7 +48,7 @@ class MaxValSimSchemaMatcher(BaseSchemaMatcher):
     def map(
         self,
         source: pd.DataFrame,
-        target: pd.DataFrame,
+        target: TargetTable,
     ):
         topk_column_matches = self.api.get_recommendations(source, target, self.top_k)
 
@@ -5,6 +5,7 @@ from bdikit.schema_matching.one2one.valentine import SimFloodSchemaMatcher
 from bdikit.models.contrastive_learning.cl_api import DEFAULT_CL_MODEL
 from bdikit.schema_matching.topk.base import BaseTopkSchemaMatcher
 from bdikit.schema_matching.topk.contrastivelearning import CLTopkSchemaMatcher
+from bdikit.standards.target_schema import TargetTable
 
 
 class TwoPhaseSchemaMatcher(BaseSchemaMatcher):
@@ -30,7 +31,7 @@ class TwoPhaseSchemaMatcher(BaseSchemaMatcher):
     def map(
         self,
         source: pd.DataFrame,
-        target: pd.DataFrame,
+        target: TargetTable,
     ):
         topk_column_matches = self.api.get_recommendations(source, target, self.top_k)
 
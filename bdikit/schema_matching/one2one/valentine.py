@@ -1,6 +1,7 @@
 import pandas as pd
 from typing import Dict, Callable
 from bdikit.schema_matching.one2one.base import BaseSchemaMatcher
+from bdikit.standards.target_schema import TargetSchema, TargetTable
 from valentine import valentine_match
 from valentine.algorithms.matcher_results import MatcherResults
 from valentine.algorithms.jaccard_distance import StringDistanceFunction
@@ -18,7 +19,10 @@ class ValentineSchemaMatcher(BaseSchemaMatcher):
     def __init__(self, matcher: BaseMatcher):
         self.matcher = matcher
 
-    def map(self, source: pd.DataFrame, target: pd.DataFrame) -> Dict[str, str]:
+    def map(self, source: pd.DataFrame, target: TargetTable) -> Dict[str, str]:
+        if isinstance(target, TargetSchema):
+            # Valentine matchers require a rectangular table
+            target = target.to_dataframe()
         matches: MatcherResults = valentine_match(source, target, self.matcher)
         mappings = {}
         for match in matches.one_to_one():
@@ -1,6 +1,7 @@
 from abc import ABCMeta, abstractmethod
 from typing import List, NamedTuple, TypedDict
 import pandas as pd
+from bdikit.standards.target_schema import TargetTable
 
 
 class ColumnScore(NamedTuple):
@@ -16,6 +17,6 @@ class TopkMatching(TypedDict):
 class BaseTopkSchemaMatcher(metaclass=ABCMeta):
     @abstractmethod
     def get_recommendations(
-        self, source: pd.DataFrame, target: pd.DataFrame, top_k: int
+        self, source: pd.DataFrame, target: TargetTable, top_k: int
     ) -> List[TopkMatching]:
         pass
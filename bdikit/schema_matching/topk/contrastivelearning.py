@@ -1,6 +1,6 @@
 import pandas as pd
 import numpy as np
-from typing import List
+from typing import List, Optional
 from bdikit.schema_matching.topk.base import (
     ColumnScore,
     TopkMatching,
@@ -8,10 +8,11 @@ from bdikit.schema_matching.topk.base import (
 )
 from sklearn.metrics.pairwise import cosine_similarity, euclidean_distances
 from bdikit.models.contrastive_learning.cl_api import (
-    ContrastiveLearningAPI,
     DEFAULT_CL_MODEL,
+    get_cl_model,
 )
 from bdikit.models import ColumnEmbedder
+from bdikit.standards.target_schema import TargetTable
 
 
 class EmbeddingSimilarityTopkSchemaMatcher(BaseTopkSchemaMatcher):
@@ -20,7 +21,7 @@ class EmbeddingSimilarityTopkSchemaMatcher(BaseTopkSchemaMatcher):
         self.metric = metric
 
     def get_recommendations(
-        self, source: pd.DataFrame, target: pd.DataFrame, top_k: int = 10
+        self, source: pd.DataFrame, target: TargetTable, top_k: int = 10
     ) -> List[TopkMatching]:
         """
         Returns the top-k matching columns in the target table for each column
@@ -55,7 +56,16 @@ class EmbeddingSimilarityTopkSchemaMatcher(BaseTopkSchemaMatcher):
 
 
 class CLTopkSchemaMatcher(EmbeddingSimilarityTopkSchemaMatcher):
-    def __init__(self, model_name: str = DEFAULT_CL_MODEL, metric: str = "cosine"):
+    def __init__(
+        self,
+        model_name: str = DEFAULT_CL_MODEL,
+        metric: str = "cosine",
+        backend: Optional[str] = None,
+        quantize: bool = False,
+    ):
         super().__init__(
-            column_embedder=ContrastiveLearningAPI(model_name=model_name), metric=metric
+            column_embedder=get_cl_model(
+                model_name=model_name, backend=backend, quantize=quantize
+            ),
+            metric=metric,
         )
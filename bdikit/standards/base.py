@@ -1,5 +1,6 @@
 import pandas as pd
 from typing import List, Dict
+from bdikit.standards.target_schema import TargetSchema
 
 
 class BaseStandard:
@@ -7,6 +8,9 @@ class BaseStandard:
     Base class for all target standards, e.g. GDC.
     """
 
+    def get_version(self) -> str:
+        raise NotImplementedError("Subclasses must implement this method")
+
     def get_columns(self) -> List[str]:
         raise NotImplementedError("Subclasses must implement this method")
 
@@ -16,5 +20,8 @@ class BaseStandard:
     def get_column_metadata(self, column_names: List[str]) -> Dict[str, Dict]:
         raise NotImplementedError("Subclasses must implement this method")
 
+    def get_target_schema(self) -> TargetSchema:
+        raise NotImplementedError("Subclasses must implement this method")
+
     def get_dataframe_rep(self) -> pd.DataFrame:
         raise NotImplementedError("Subclasses must implement this method")
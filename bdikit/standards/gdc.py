@@ -1,8 +1,12 @@
 import json
+import hashlib
 import pandas as pd
-from os.path import join, dirname
+from os.path import join, dirname, isfile
 from typing import List, Dict
 from bdikit.standards.base import BaseStandard
+from bdikit.standards.index import StandardIndex
+from bdikit.standards.target_schema import TargetSchema
+from bdikit.download import BDIKIT_STANDARDS_CACHE_DIR
 
 
 GDC_SCHEMA_PATH = join(dirname(__file__), "../resource/gdc_schema.json")
@@ -10,61 +14,75 @@ GDC_SCHEMA_PATH = join(dirname(__file__), "../resource/gdc_schema.json")
 
 class GDC(BaseStandard):
     """
-    Class for GDC standard.
+    Class for GDC standard. The JSON schema is parsed only once, to build an
+    indexed copy of the standard in the bdikit cache (see StandardIndex), which
+    is then used to look up the values and metadata of the columns.
     """
 
     def __init__(self) -> None:
-        self.data = None
-        self.__read_data()
+        self.version = self.__compute_version()
+        index_path = join(BDIKIT_STANDARDS_CACHE_DIR, f"gdc-{self.version}.sqlite")
+        if not isfile(index_path):
+            self.__build_index(index_path)
+        self.index = StandardIndex(index_path)
 
-    def __read_data(self):
+    def __build_index(self, index_path: str):
         with open(GDC_SCHEMA_PATH) as json_file:
-            self.data = json.load(json_file)
+            data = json.load(json_file)
+
+        StandardIndex.build(
+            index_path,
+            (
+                (
+                    column_name,
+                    raw_metadata.get("column_description", ""),
+                    list(raw_metadata.get("value_data", {}).keys()),
+                    list(raw_metadata.get("value_data", {}).values()),
+                )
+                for column_name, raw_metadata in data.items()
+            ),
+        )
+
+    def __compute_version(self) -> str:
+        # The schema file has no explicit version, so we use a digest of its
+        # contents to identify each release of the resource.
+        with open(GDC_SCHEMA_PATH, "rb") as schema_file:
+            return hashlib.sha256(schema_file.read()).hexdigest()[:16]
+
+    def get_version(self) -> str:
+        return self.version
 
     def get_columns(self) -> List[str]:
-        return list(self.data.keys())
+        return self.index.get_columns()
 
     def get_column_values(
         self, column_names: List[str]
     ) -> Dict[str, List]:  # get_gdc_data
-        column_values = {}
+        column_values = self.index.get_column_values(column_names)
 
-        for column_name in column_names:
-            raw_metadata = self.data.get(column_name, {})
-            column_values[column_name] = list(raw_metadata.get("value_data", {}).keys())
-
-        return column_values
+        return {
+            column_name: values if values is not None else []
+            for column_name, values in column_values.items()
+        }
 
     def get_column_metadata(
         self, column_names: List[str]
     ) -> Dict[str, Dict]:  # get_gdc_metadata
         column_metadata = {}
 
-        for column_name in column_names:
-            raw_metadata = self.data.get(column_name, {})
+        for column_name, metadata in self.index.get_column_metadata(
+            column_names
+        ).items():
+            description, value_names, value_descriptions = metadata or ("", [], [])
             column_metadata[column_name] = {}
-            column_metadata[column_name]["description"] = raw_metadata.get(
-                "column_description", ""
-            )
-            column_metadata[column_name]["value_names"] = list(
-                raw_metadata.get("value_data", {}).keys()
-            )
-            column_metadata[column_name]["value_descriptions"] = list(
-                raw_metadata.get("value_data", {}).values()
-            )
+            column_metadata[column_name]["description"] = description
+            column_metadata[column_name]["value_names"] = value_names
+            column_metadata[column_name]["value_descriptions"] = value_descriptions
 
         return column_metadata
 
-    def get_dataframe_rep(self) -> pd.DataFrame:
-        reshaped_data = {
-            key: list(value["value_data"].keys()) for key, value in self.data.items()
-        }
+    def get_target_schema(self) -> TargetSchema:
+        return TargetSchema(self.index.get_all_column_values())
 
-        # Ensure all lists have the same length by padding with None
-        max_length = max(len(v) for v in reshaped_data.values())
-        for k, v in reshaped_data.items():
-            reshaped_data[k].extend([None] * (max_length - len(v)))
-
-        df = pd.DataFrame.from_dict(reshaped_data, orient="columns")
-
-        return df
+    def get_dataframe_rep(self) -> pd.DataFrame:
+        return self.get_target_schema().to_dataframe()
@@ -0,0 +1,110 @@
+import os
+import json
+import sqlite3
+from typing import Dict, Iterable, List, Tuple
+from bdikit.utils import SQLiteCache
+
+
+class StandardIndex(SQLiteCache):
+    """
+    Read-only SQLite representation of a standard, with one row per column
+    holding its description and its values (serialized as JSON lists). It allows
+    fetching the values and metadata of a few columns without parsing the rest
+    of the standard. The index file is built once with StandardIndex.build().
+    """
+
+    def __init__(self, index_path: str):
+        super().__init__(index_path, read_only=True)
+
+    @staticmethod
+    def build(
+        index_path: str, columns: Iterable[Tuple[str, str, List[str], List[str]]]
+    ):
+        """
+        Creates the index file from tuples (column name, description, value
+        names, value descriptions), listed in the order of the standard.
+        """
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        # Write to a temporary file first so that concurrent processes never
+        # open a partially written index
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        connection = sqlite3.connect(tmp_path)
+        try:
+            connection.execute(
+                "CREATE TABLE columns ("
+                "position INTEGER PRIMARY KEY, "
+                "name TEXT UNIQUE NOT NULL, "
+                "description TEXT NOT NULL, "
+                "value_names TEXT NOT NULL, "
+                "value_descriptions TEXT NOT NULL)"
+            )
+            connection.executemany(
+                "INSERT INTO columns VALUES (?, ?, ?, ?, ?)",
+                (
+                    (position, name, description, json.dumps(names), json.dumps(descs))
+                    for position, (name, description, names, descs) in enumerate(
+                        columns
+                    )
+                ),
+            )
+            connection.commit()
+        finally:
+            connection.close()
+        os.replace(tmp_path, index_path)
+
+    def _get_rows(self, column_names: List[str], fields: str) -> Dict[str, Tuple]:
+        return {
+            name: values
+            for name, *values in self._execute_in(
+                f"SELECT name, {fields} FROM columns WHERE name IN ({{}})",
+                column_names,
+            )
+        }
+
+    def get_columns(self) -> List[str]:
+        return [
+            name
+            for (name,) in self._execute("SELECT name FROM columns ORDER BY position")
+        ]
+
+    def get_column_values(self, column_names: List[str]) -> Dict[str, List[str]]:
+        """Returns the values of each column, or None for unknown columns."""
+        rows = self._get_rows(column_names, "value_names")
+        return {
+            name: json.loads(rows[name][0]) if name in rows else None
+            for name in column_names
+        }
+
+    def get_column_metadata(
+        self, column_names: List[str]
+    ) -> Dict[str, Tuple[str, List[str], List[str]]]:
+        """
+        Returns the description, value names and value descriptions of each
+        column, or None for unknown columns.
+        """
+        rows = self._get_rows(
+            column_names, "description, value_names, value_descriptions"
+        )
+        metadata = {}
+        for name in column_names:
+            if name in rows:
+                description, names, descriptions = rows[name]
+                metadata[name] = (
+                    description,
+                    json.loads(names),
+                    json.loads(descriptions),
+                )
+            else:
+                metadata[name] = None
+        return metadata
+
+    def get_all_column_values(self) -> Dict[str, List[str]]:
+        """Returns the values of all columns, in the order of the standard."""
+        return {
+            name: json.loads(names)
+            for name, names in self._execute(
+                "SELECT name, value_names FROM columns ORDER BY position"
+            )
+        }
@@ -1,8 +1,11 @@
 import importlib
 from enum import Enum
-from typing import Mapping, Any
+from typing import Mapping, Any, Dict, Hashable
 from bdikit.standards.base import BaseStandard
 
+# Standards already created by this process, keyed by name and arguments
+_loaded_standards: Dict[Hashable, BaseStandard] = {}
+
 
 class Standards(Enum):
     GDC = ("gdc", "bdikit.standards.gdc.GDC")
@@ -21,11 +24,22 @@ class Standards(Enum):
                 f"The {standard_name} standard is not supported. "
                 f"Supported standards are: {names}"
             )
+        key = (standard_name, tuple(sorted(standard_kwargs.items())))
+        try:
+            if key in _loaded_standards:
+                return _loaded_standards[key]
+        except TypeError:
+            # unhashable arguments, the standard is not cached
+            key = None
+
         # Load the class dynamically
         module_path, class_name = standards[standard_name].rsplit(".", 1)
         module = importlib.import_module(module_path)
+        standard = getattr(module, class_name)(**standard_kwargs)
 
-        return getattr(module, class_name)(**standard_kwargs)
+        if key is not None:
+            _loaded_standards[key] = standard
+        return standard
 
 
 standards = {standard.standard_name: standard.standard_path for standard in Standards}
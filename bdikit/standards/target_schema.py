@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
+
+
+class TargetSchema:
+    """
+    Columnar representation of a target schema (e.g., a standard such as GDC),
+    where each column keeps its own domain, i.e., its list of values, as a
+    separate array. Unlike a DataFrame, domains of different sizes are not
+    padded to a common length.
+
+    It supports the subset of the DataFrame interface used by the schema
+    matchers (`columns`, `attrs`, `schema[column]` and `schema[columns]`), so
+    it can be given directly to them. Matchers that need a rectangular table
+    (e.g., the Valentine matchers) can use to_dataframe().
+    """
+
+    def __init__(
+        self,
+        domains: Mapping[str, Sequence],
+        attrs: Optional[Dict[str, Any]] = None,
+        num_rows: Optional[int] = None,
+    ):
+        """
+        Args:
+            domains (Mapping[str, Sequence]): The values of each column, in the
+                order of the columns of the schema.
+            attrs (Dict[str, Any], optional): Metadata of the schema, as in
+                pd.DataFrame.attrs.
+            num_rows (int, optional): The number of rows of the rectangular
+                representation of the schema. Defaults to the size of the
+                largest domain.
+        """
+        self.domains: Dict[str, np.ndarray] = {}
+        for column, values in domains.items():
+            if not isinstance(values, np.ndarray):
+                array = np.empty(len(values), dtype=object)
+                array[:] = list(values)
+                values = array
+            self.domains[column] = values
+        self.columns = pd.Index(list(self.domains.keys()), dtype=object)
+        self.attrs: Dict[str, Any] = dict(attrs) if attrs else {}
+        if num_rows is None:
+            num_rows = max((len(v) for v in self.domains.values()), default=0)
+        self.num_rows = num_rows
+
+    def __getitem__(
+        self, key: Union[str, List[str]]
+    ) -> Union[pd.Series, "TargetSchema"]:
+        if isinstance(key, str):
+            if key not in self.domains:
+                raise KeyError(key)
+            return pd.Series(self.domains[key], name=key, dtype=object)
+        return TargetSchema(
+            {column: self.domains[column] for column in key},
+            attrs=self.attrs,
+            num_rows=self.num_rows,
+        )
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.domains
+
+    def get_padded_column(self, column: str) -> pd.Series:
+        """
+        Returns the values of the column padded with None to `num_rows`, i.e.,
+        the column as it appears in to_dataframe().
+        """
+        values = self.domains[column]
+        padded = np.full(self.num_rows, None, dtype=object)
+        padded[: len(values)] = values
+        return pd.Series(padded, name=column)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Returns a DataFrame with one column per column of the schema, where all
+        domains are padded with None to `num_rows`.
+        """
+        padded_domains = {}
+        for column, values in self.domains.items():
+            padded_domains[column] = list(values) + [None] * (
+                self.num_rows - len(values)
+            )
+
+        df = pd.DataFrame.from_dict(padded_domains, orient="columns")
+        df.attrs.update(self.attrs)
+
+        return df
+
+
+# Target tables accepted by the schema matchers
+TargetTable = Union[pd.DataFrame, TargetSchema]
@@ -1,60 +1,355 @@
 import os
+import json
+import struct
+import sqlite3
 import hashlib
+import threading
+import numpy as np
 import pandas as pd
 from os.path import join, dirname, isfile
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from bdikit.download import BDIKIT_EMBEDDINGS_CACHE_DIR
 
+BDIKIT_STANDARD_EMBEDDINGS_DIR = join(BDIKIT_EMBEDDINGS_CACHE_DIR, "standards")
 
-def hash_dataframe(df: pd.DataFrame) -> str:
+# Embedding files start with this magic string followed by the length of a JSON
+# header (uint32, little-endian), the header itself, and the float32 matrix
+EMBEDDING_FILE_MAGIC = b"BDIKEMB1"
+EMBEDDING_FILE_ALIGNMENT = 64
+EMBEDDING_INDEX_FILE = "index.tsv"
+
+# Standard embeddings already loaded by this process, keyed by file path
+_standard_embeddings: Dict[str, Tuple[np.ndarray, Dict[str, int]]] = {}
+
+# In-memory copies of the cache index files, keyed by index file path. Each
+# entry holds the mapping from keys to embedding files and the number of bytes
+# of the index file that have already been read.
+_embedding_indexes: Dict[str, Tuple[Dict[str, str], int]] = {}
+
+
+def hash_dataframe(
+    df: pd.DataFrame,
+    rows: Optional[Sequence[int]] = None,
+    chunk_size: int = 100_000,
+) -> str:
+    """
+    Computes a fingerprint of the DataFrame (column names and values) that can
+    be used as a cache key. Rows are hashed chunk by chunk using the vectorized
+    pd.util.hash_pandas_object(), so no per-row strings are materialized.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to fingerprint.
+        rows (Sequence[int], optional): The positions of the rows to include in
+            the fingerprint. Useful when only some rows are used by the consumer
+            of the cache (e.g., the rows sampled by an embedding model). If None,
+            all rows are included.
+        chunk_size (int, optional): The number of rows hashed at once.
+    """
     hash_object = hashlib.sha256()
 
-    columns_string = ",".join(df.columns) + "\n"
+    columns_string = ",".join(map(str, df.columns)) + "\n"
     hash_object.update(columns_string.encode())
 
-    for row in df.itertuples(index=False, name=None):
-        row_string = ",".join(map(str, row)) + "\n"
-        hash_object.update(row_string.encode())
+    if rows is not None:
+        df = df.iloc[rows]
+
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start : start + chunk_size]
+        try:
+            row_hashes = pd.util.hash_pandas_object(chunk, index=False)
+        except TypeError:
+            # object columns holding unhashable values (e.g., lists or dicts)
+            row_hashes = pd.util.hash_pandas_object(chunk.astype(str), index=False)
+        hash_object.update(row_hashes.to_numpy().tobytes())
 
     return hash_object.hexdigest()
 
 
-def write_embeddings_to_cache(embedding_file: str, embeddings: list):
+def write_embeddings_file(
+    embedding_file: str, embeddings: np.ndarray, model_id: str, columns: List[str]
+):
+    """
+    Writes the embeddings to a binary file that can be memory-mapped by
+    read_embeddings_file(). The file starts with a small JSON header holding
+    the model id, the dimension and the column names, followed by the raw
+    float32 matrix with one row per column.
+    """
+    embeddings = np.ascontiguousarray(embeddings, dtype="<f4")
+    if embeddings.ndim != 2 or len(embeddings) != len(columns):
+        raise ValueError(
+            f"Expected a matrix with one row for each of the {len(columns)} columns, "
+            f"but got an array of shape {embeddings.shape}"
+        )
+
+    header = json.dumps(
+        {
+            "model": model_id,
+            "dim": embeddings.shape[1],
+            "count": embeddings.shape[0],
+            "columns": [str(column) for column in columns],
+        }
+    ).encode()
+    prefix_size = len(EMBEDDING_FILE_MAGIC) + 4
+    padding = -(prefix_size + len(header)) % EMBEDDING_FILE_ALIGNMENT
+    header += b" " * padding
 
     os.makedirs(dirname(embedding_file), exist_ok=True)
 
-    with open(embedding_file, "w") as file:
-        for vec in embeddings:
-            file.write(",".join([str(val) for val in vec]) + "\n")
+    # Write to a temporary file first so that concurrent readers never see a
+    # partially written file
+    tmp_file = f"{embedding_file}.{os.getpid()}.tmp"
+    with open(tmp_file, "wb") as file:
+        file.write(EMBEDDING_FILE_MAGIC)
+        file.write(struct.pack("<I", len(header)))
+        file.write(header)
+        file.write(embeddings.tobytes())
+    os.replace(tmp_file, embedding_file)
+
+
+def read_embeddings_file(embedding_file: str) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """
+    Reads a file written by write_embeddings_file(). Returns a read-only
+    memory-mapped float32 matrix and the header of the file.
+    """
+    with open(embedding_file, "rb") as file:
+        magic = file.read(len(EMBEDDING_FILE_MAGIC))
+        if magic != EMBEDDING_FILE_MAGIC:
+            raise ValueError(f"Not an embedding file: {embedding_file}")
+        (header_size,) = struct.unpack("<I", file.read(4))
+        header = json.loads(file.read(header_size))
+
+    shape = (header["count"], header["dim"])
+    offset = len(EMBEDDING_FILE_MAGIC) + 4 + header_size
+    if shape[0] == 0:
+        return np.empty(shape, dtype=np.float32), header
+
+    embeddings = np.memmap(
+        embedding_file, dtype="<f4", mode="r", offset=offset, shape=shape
+    )
+    return embeddings, header
 
 
-def check_embedding_cache(table: pd.DataFrame, model_path: str):
-    embedding_file = None
-    embeddings = None
-    table_hash = hash_dataframe(table)
-    model_name = model_path.split("/")[-1]
-    cache_model_path = join(BDIKIT_EMBEDDINGS_CACHE_DIR, model_name)
+def _read_embedding_index(index_file: str) -> Dict[str, Tuple[str, int]]:
+    """
+    Returns the mapping from column keys to their location in the cache, i.e.,
+    the embedding file name and the row of the column in that file. The index
+    is append-only, so only the entries added since the last call are read
+    from disk.
+    """
+    index, read_size = _embedding_indexes.get(index_file, ({}, 0))
+    try:
+        file_size = os.path.getsize(index_file)
+    except OSError:
+        return index
+
+    if file_size > read_size:
+        with open(index_file, "rb") as file:
+            file.seek(read_size)
+            data = file.read(file_size - read_size)
+        # ignore a trailing line that may still being written by another process
+        data = data[: data.rfind(b"\n") + 1]
+        for line in data.decode().splitlines():
+            fields = line.split("\t")
+            if len(fields) == 3 and fields[2].isdigit():
+                index[fields[0]] = (fields[1], int(fields[2]))
+        read_size += len(data)
+
+    _embedding_indexes[index_file] = (index, read_size)
+    return index
+
+
+def _append_to_embedding_index(index_file: str, keys: List[str], file_name: str):
+    lines = "".join(f"{key}\t{file_name}\t{row}\n" for row, key in enumerate(keys))
+    with open(index_file, "a") as file:
+        file.write(lines)
+
+
+def write_embeddings_to_cache(
+    keys: List[str], embeddings: np.ndarray, model_id: str, columns: List[str]
+):
+    """
+    Stores the embeddings of a batch of columns in the cache. Each column is
+    identified by its key, e.g., a hash of the sampled column, so that it can be later
+    retrieved independently of the table it was computed for.
+    """
+    cache_model_path = join(BDIKIT_EMBEDDINGS_CACHE_DIR, model_id)
+    batch_hash = hashlib.sha256("\n".join(keys).encode()).hexdigest()
+    file_name = f"{batch_hash}.emb"
+
+    write_embeddings_file(
+        join(cache_model_path, file_name), embeddings, model_id, columns
+    )
+    _append_to_embedding_index(
+        join(cache_model_path, EMBEDDING_INDEX_FILE), keys, file_name
+    )
+
+
+def check_embedding_cache(keys: List[str], model_id: str) -> Dict[str, np.ndarray]:
+    """
+    Returns the cached embeddings of the columns identified by the given keys.
+    Columns that are not present in the cache are not included in the result.
+    """
+    cache_model_path = join(BDIKIT_EMBEDDINGS_CACHE_DIR, model_id)
     os.makedirs(cache_model_path, exist_ok=True)
 
-    hash_list = {
-        f for f in os.listdir(cache_model_path) if isfile(join(cache_model_path, f))
-    }
-
-    embedding_file = join(cache_model_path, table_hash)
-
-    # Check if table for computing embedding is the same as the tables we have in resources
-    if table_hash in hash_list:
-        if isfile(embedding_file):
-            try:
-                # Load embeddings from disk
-                with open(embedding_file, "r") as file:
-                    embeddings = [
-                        [float(val) for val in vec.split(",")]
-                        for vec in file.read().split("\n")
-                        if vec.strip()
-                    ]
-
-            except Exception as e:
-                print(f"Error loading features from cache: {e}")
-                embeddings = None
-
-    return embedding_file, embeddings
+    index = _read_embedding_index(join(cache_model_path, EMBEDDING_INDEX_FILE))
+
+    # Group the keys by file, so that each file is mapped only once
+    keys_by_file: Dict[str, List[Tuple[str, int]]] = {}
+    for key in keys:
+        if key in index:
+            file_name, row = index[key]
+            keys_by_file.setdefault(file_name, []).append((key, row))
+
+    embeddings = {}
+    for file_name, file_keys in keys_by_file.items():
+        try:
+            # Load embeddings from disk
+            file_embeddings, header = read_embeddings_file(
+                join(cache_model_path, file_name)
+            )
+            if header["model"] != model_id:
+                continue
+            for key, row in file_keys:
+                embeddings[key] = file_embeddings[row]
+        except Exception as e:
+            print(f"Error loading features from cache: {e}")
+
+    return embeddings
+
+
+def get_standard_embeddings_path(
+    model_name: str, standard_name: str, standard_version: str
+) -> str:
+    return join(
+        BDIKIT_STANDARD_EMBEDDINGS_DIR,
+        model_name,
+        f"{standard_name}-{standard_version}.emb",
+    )
+
+
+def load_standard_embeddings(
+    model_name: str, standard_name: str, standard_version: str
+) -> Optional[Tuple[np.ndarray, Dict[str, int]]]:
+    """
+    Returns the embedding matrix (float32, one row per column) stored for the
+    given model and standard version, along with a dictionary that maps each
+    column name to its row in the matrix. Returns None if the embeddings have
+    not been computed yet.
+    """
+    embedding_file = get_standard_embeddings_path(
+        model_name, standard_name, standard_version
+    )
+    if embedding_file in _standard_embeddings:
+        return _standard_embeddings[embedding_file]
+
+    if not isfile(embedding_file):
+        return None
+
+    try:
+        embeddings, header = read_embeddings_file(embedding_file)
+    except Exception as e:
+        print(f"Error loading standard embeddings from cache: {e}")
+        return None
+
+    column_index = {column: i for i, column in enumerate(header["columns"])}
+    _standard_embeddings[embedding_file] = (embeddings, column_index)
+    return embeddings, column_index
+
+
+def write_standard_embeddings(
+    model_name: str,
+    standard_name: str,
+    standard_version: str,
+    columns: List[str],
+    embeddings: np.ndarray,
+):
+    embedding_file = get_standard_embeddings_path(
+        model_name, standard_name, standard_version
+    )
+    write_embeddings_file(embedding_file, embeddings, model_name, columns)
+    _standard_embeddings.pop(embedding_file, None)
+
+
+class SQLiteCache:
+    """
+    Base class of the persistent caches stored in an SQLite database, which can
+    be shared by the threads of a process and by many processes. Subclasses
+    define the tables of the database in `schema`.
+
+    The connection is opened on first use and reopened in forked processes.
+    Pickled caches (e.g., sent to worker processes) only keep their path.
+    Read-only databases are opened as they are, without creating the schema.
+    """
+
+    schema: str = ""
+
+    # SQLite limits the number of parameters of a statement
+    max_parameters: int = 500
+
+    def __init__(self, path: str, read_only: bool = False):
+        self.path = path
+        self.read_only = read_only
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_connection"] = None
+        state["_pid"] = None
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # SQLite connections must not be shared with forked processes
+        if self._connection is None or self._pid != os.getpid():
+            if self.read_only:
+                self._connection = sqlite3.connect(
+                    f"file:{self.path}?mode=ro", uri=True, check_same_thread=False
+                )
+            else:
+                os.makedirs(dirname(self.path), exist_ok=True)
+                self._connection = sqlite3.connect(
+                    self.path, timeout=30, check_same_thread=False
+                )
+                # WAL lets readers in other processes proceed while one writes
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self._connection.executescript(self.schema)
+            self._pid = os.getpid()
+        return self._connection
+
+    def _execute(self, sql: str, parameters: Sequence[Any] = ()) -> List[tuple]:
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                return connection.execute(sql, parameters).fetchall()
+
+    def _execute_in(
+        self, sql: str, values: Sequence[Any], parameters: Sequence[Any] = ()
+    ) -> List[tuple]:
+        """
+        Runs a query whose `sql` has an "IN ({})" clause for the given values,
+        after the other `parameters`. The values are sent in chunks of at most
+        `max_parameters`, and the rows of all the chunks are returned.
+        """
+        values = list(values)
+        rows: List[tuple] = []
+        for start in range(0, len(values), self.max_parameters):
+            chunk = values[start : start + self.max_parameters]
+            rows.extend(
+                self._execute(
+                    sql.format(", ".join("?" * len(chunk))), (*parameters, *chunk)
+                )
+            )
+        return rows
+
+    def _executemany(self, sql: str, parameters: Sequence[Sequence[Any]]):
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany(sql, parameters)
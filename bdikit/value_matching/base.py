@@ -1,4 +1,14 @@
-from typing import List, NamedTuple, TypedDict, Set
+import numpy as np
+from typing import (
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    TypedDict,
+    Set,
+    Union,
+)
 
 
 class ValueMatch(NamedTuple):
@@ -12,6 +22,92 @@ class ValueMatch(NamedTuple):
     similarity: float
 
 
+class ValueMatches(Sequence[ValueMatch]):
+    """
+    Columnar list of value matches, i.e., the source values, target values and
+    similarities of the matches stored in three aligned arrays. It behaves as a
+    read-only list of ValueMatch objects, but results can be built (and turned
+    into DataFrames) without creating a tuple per match.
+    """
+
+    def __init__(
+        self,
+        source_values: Union[np.ndarray, Sequence],
+        target_values: Union[np.ndarray, Sequence],
+        similarities: Union[np.ndarray, Sequence[float]],
+    ):
+        self.source_values = np.asarray(source_values, dtype=object)
+        self.target_values = np.asarray(target_values, dtype=object)
+        self.similarities = np.asarray(similarities, dtype=np.float64)
+        if not (
+            len(self.source_values) == len(self.target_values) == len(self.similarities)
+        ):
+            raise ValueError("The arrays of value matches must have the same length")
+
+    @classmethod
+    def concatenate(cls, parts: Sequence[Sequence[ValueMatch]]) -> "ValueMatches":
+        """
+        Returns the matches of all the parts (ValueMatches or lists of
+        ValueMatch objects), sorted by decreasing similarity. Matches with the
+        same similarity keep their order.
+        """
+        columns = []
+        for part in parts:
+            if isinstance(part, ValueMatches):
+                columns.append(
+                    (part.source_values, part.target_values, part.similarities)
+                )
+            elif len(part) > 0:
+                source_values, target_values, similarities = zip(*part)
+                columns.append(
+                    (
+                        np.asarray(source_values, dtype=object),
+                        np.asarray(target_values, dtype=object),
+                        np.asarray(similarities, dtype=np.float64),
+                    )
+                )
+        if len(columns) == 0:
+            return cls([], [], [])
+
+        source_values, target_values, similarities = (
+            np.concatenate(column) for column in zip(*columns)
+        )
+        order = np.argsort(-similarities, kind="stable")
+        return cls(source_values[order], target_values[order], similarities[order])
+
+    def __len__(self) -> int:
+        return len(self.similarities)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ValueMatches(
+                self.source_values[index],
+                self.target_values[index],
+                self.similarities[index],
+            )
+        return ValueMatch(
+            self.source_values[index],
+            self.target_values[index],
+            float(self.similarities[index]),
+        )
+
+    def __iter__(self) -> Iterator[ValueMatch]:
+        return map(
+            ValueMatch,
+            self.source_values,
+            self.target_values,
+            self.similarities.tolist(),
+        )
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ValueMatches, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ValueMatches({list(self)!r})"
+
+
 class ValueMatchingResult(TypedDict):
     """
     Represents the result of a value matching operation.
@@ -19,10 +115,14 @@ class ValueMatchingResult(TypedDict):
 
     source: str
     target: str
-    matches: List[ValueMatch]
+    matches: Union[List[ValueMatch], ValueMatches]
     coverage: float
     unique_values: Set[str]
     unmatch_values: Set[str]
+    # The numbers of source values found in and missing from the memo store,
+    # or None if no store was used
+    memo_hits: Optional[int]
+    memo_misses: Optional[int]
 
 
 class BaseValueMatcher:
@@ -33,5 +133,10 @@ class BaseValueMatcher:
 
     def match(
         self, source_values: List[str], target_values: List[str]
-    ) -> List[ValueMatch]:
+    ) -> Sequence[ValueMatch]:
+        """
+        Returns the matches of the source values to the target values as a
+        sequence of ValueMatch objects: a list, or a columnar ValueMatches for
+        matchers that compute their scores in bulk.
+        """
         raise NotImplementedError("Subclasses must implement this method")
@@ -0,0 +1,281 @@
+import numpy as np
+from rapidfuzz import process
+from scipy.sparse import csr_matrix
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from bdikit.value_matching.base import BaseValueMatcher, ValueMatch, ValueMatches
+from bdikit.value_matching.matcher_factory import ValueMatchers
+from bdikit.config import VALUE_MATCHING_THRESHOLD
+
+
+def _qgrams(value: str, q: int) -> List[Tuple[str, int]]:
+    """
+    Returns the q-grams of the value padded with q - 1 sentinel characters on
+    each side. Repeated q-grams are numbered (i.e., the k-th occurrence of a
+    q-gram g is (g, k)), so that the dot product of two binary q-gram vectors
+    is the size of the multiset intersection of their q-grams.
+    """
+    padded = "\x02" * (q - 1) + value + "\x03" * (q - 1)
+    occurrences: Dict[str, int] = {}
+    qgrams = []
+    for i in range(len(padded) - q + 1):
+        qgram = padded[i : i + q]
+        occurrence = occurrences.get(qgram, 0)
+        occurrences[qgram] = occurrence + 1
+        qgrams.append((qgram, occurrence))
+    return qgrams
+
+
+class QGramIndex:
+    """
+    Inverted index of the character q-grams of a list of values, used to
+    generate the candidate values that may be similar to a query value.
+
+    Candidates are selected using the length and count filters for the edit
+    distance (a string at distance d from another shares at least
+    max(len) + q - 1 - q * d padded q-grams with it). These filters guarantee
+    that no value whose normalized Indel similarity to the query (i.e.,
+    rapidfuzz.fuzz.ratio / 100) is at least the given threshold is pruned.
+    """
+
+    def __init__(self, values: Sequence[str], q: int = 2):
+        if q < 1:
+            raise ValueError("q must be at least 1")
+        self.values = list(values)
+        self.q = q
+        self.lengths = np.array([len(value) for value in self.values])
+        self._vocabulary: Dict[Tuple[str, int], int] = {}
+        self._matrix = self._vectorize(self.values, extend_vocabulary=True)
+
+    def _vectorize(
+        self, values: Sequence[str], extend_vocabulary: bool = False
+    ) -> csr_matrix:
+        indptr = [0]
+        indices: List[int] = []
+        for value in values:
+            for qgram in _qgrams(value, self.q):
+                column = self._vocabulary.get(qgram)
+                if column is None:
+                    if not extend_vocabulary:
+                        continue
+                    column = len(self._vocabulary)
+                    self._vocabulary[qgram] = column
+                indices.append(column)
+            indptr.append(len(indices))
+
+        data = np.ones(len(indices), dtype=np.int32)
+        return csr_matrix(
+            (data, indices, indptr), shape=(len(values), len(self._vocabulary))
+        )
+
+    def candidates(
+        self, values: Sequence[str], threshold: float, chunk_size: int = 1024
+    ) -> List[np.ndarray]:
+        """
+        Returns, for each of the given values, the positions of the indexed
+        values whose similarity to it may be greater than or equal to the
+        threshold.
+        """
+        results = []
+        # Queries are processed in chunks to bound the size of the (sparse)
+        # matrix of common q-gram counts
+        for start in range(0, len(values), chunk_size):
+            chunk = values[start : start + chunk_size]
+            common = (self._vectorize(chunk) @ self._matrix.T).tocsr()
+            for i, value in enumerate(chunk):
+                total_length = len(value) + self.lengths
+                max_distance = np.floor((1.0 - threshold) * total_length + 1e-9)
+                required = (
+                    np.maximum(len(value), self.lengths)
+                    + self.q
+                    - 1
+                    - self.q * max_distance
+                )
+                counts = np.zeros(len(self.values), dtype=np.int64)
+                row = common.getrow(i)
+                counts[row.indices] = row.data
+                keep = (np.abs(len(value) - self.lengths) <= max_distance) & (
+                    counts >= required
+                )
+                results.append(np.flatnonzero(keep))
+        return results
+
+
+def _get_pair_scorer(
+    matcher: BaseValueMatcher,
+) -> Optional[Callable[..., float]]:
+    """
+    Returns the rapidfuzz scorer of matchers that keep the top-scored target
+    values of each source value (i.e., EditDistanceValueMatcher and
+    RapidFuzzValueMatcher), whose matches can be computed from the scores of
+    the candidate pairs alone, or None for other matchers.
+    """
+    from bdikit.value_matching.polyfuzz import EditDistanceValueMatcher
+    from bdikit.value_matching.rapidfuzz import RapidFuzzValueMatcher
+
+    # subclasses that override match() may not keep the top-scored targets
+    if type(matcher).match in (
+        EditDistanceValueMatcher.match,
+        RapidFuzzValueMatcher.match,
+    ) and isinstance(matcher, (EditDistanceValueMatcher, RapidFuzzValueMatcher)):
+        return matcher.scorer
+    return None
+
+
+class BlockingValueMatcher(BaseValueMatcher):
+    """
+    Wraps a value matcher so that each source value is only compared with the
+    target values that pass the filters of a q-gram index (see QGramIndex),
+    instead of with the whole target domain. This prunes most of the work of
+    expensive matchers (e.g., edit distance or GPT) on large target domains.
+
+    For edit distance matchers ("edit_distance" and "rapidfuzz"), the
+    candidate pairs of all source values are scored at once with their
+    rapidfuzz scorer. Other matchers are called once per chunk of source
+    values, with the union of the candidates of the chunk as target values.
+
+    Pruning is lossless for matchers whose scores are the normalized Indel
+    similarity (e.g., the default "edit_distance" matcher) as long as
+    `blocking_threshold` is not greater than their threshold. For other
+    matchers, the q-gram filters act as a heuristic candidate generator.
+    """
+
+    def __init__(
+        self,
+        matcher: Union[str, BaseValueMatcher] = "edit_distance",
+        threshold: float = VALUE_MATCHING_THRESHOLD,
+        blocking_threshold: Optional[float] = None,
+        q: int = 2,
+        chunk_size: int = 1024,
+        **matcher_kwargs: Mapping[str, Any],
+    ):
+        """
+        Args:
+            matcher (Union[str, BaseValueMatcher], optional): The matcher that
+                scores the candidates, or its name in ValueMatchers.
+            threshold (float, optional): The threshold of the matcher, if it is
+                created from its name.
+            blocking_threshold (float, optional): The minimum edit similarity
+                between a source and a target value for the target value to be a
+                candidate. Defaults to the threshold of the matcher.
+            q (int, optional): The length of the q-grams of the index.
+            chunk_size (int, optional): The number of source values whose
+                candidates are generated (and scored) at once.
+            **matcher_kwargs: Additional arguments of the matcher, if it is
+                created from its name (e.g., top_k).
+        """
+        if isinstance(matcher, str):
+            matcher = ValueMatchers.get_matcher(
+                matcher, threshold=threshold, **matcher_kwargs
+            )
+        elif not isinstance(matcher, BaseValueMatcher):
+            raise ValueError(
+                "The matcher must be a string or an instance of BaseValueMatcher"
+            )
+        self.matcher = matcher
+        if blocking_threshold is None:
+            blocking_threshold = getattr(matcher, "threshold", threshold)
+        self.blocking_threshold = blocking_threshold
+        self.q = q
+        self.chunk_size = chunk_size
+        self._index: Optional[QGramIndex] = None
+        self._scorer = _get_pair_scorer(matcher)
+
+    def _get_index(self, target_values: List[str]) -> QGramIndex:
+        # The index of the last target domain is reused, since the same domain
+        # is usually matched against the values of several source columns
+        index = self._index
+        if index is None or index.values != target_values:
+            index = QGramIndex(target_values, q=self.q)
+            self._index = index
+        return index
+
+    def _score_candidates(
+        self,
+        source_values: List[str],
+        target_values: List[str],
+        candidates: List[np.ndarray],
+    ) -> ValueMatches:
+        """
+        Returns the top-k candidates of each source value whose similarity is
+        at least the threshold of the matcher, sorted by similarity. All the
+        candidate pairs are scored in a single rapidfuzz call.
+        """
+        sources = np.repeat(np.arange(len(source_values)), [len(c) for c in candidates])
+        targets = np.concatenate(candidates).astype(np.int64)
+        source_array = np.asarray(source_values, dtype=object)
+        target_array = np.asarray(target_values, dtype=object)
+        scores = (
+            process.cpdist(
+                source_array[sources].tolist(),
+                target_array[targets].tolist(),
+                scorer=self._scorer,
+                dtype=np.float64,
+                workers=getattr(self.matcher, "n_jobs", -1),
+            )
+            / 100.0
+        )
+
+        keep = scores >= self.matcher.threshold
+        sources, targets, scores = sources[keep], targets[keep], scores[keep]
+
+        # rank the candidates of each source value by similarity (ties are
+        # broken by target position, as in the unblocked matchers)
+        order = np.lexsort((targets, -scores, sources))
+        sources, targets, scores = sources[order], targets[order], scores[order]
+        starts = np.flatnonzero(np.r_[True, sources[1:] != sources[:-1]])
+        ranks = np.arange(len(sources)) - np.repeat(
+            starts, np.diff(np.r_[starts, len(sources)])
+        )
+        keep = ranks < getattr(self.matcher, "top_k", 1)
+        sources, targets, scores = sources[keep], targets[keep], scores[keep]
+
+        order = np.argsort(-scores, kind="stable")
+        return ValueMatches(
+            source_array[sources[order]],
+            target_array[targets[order]],
+            scores[order],
+        )
+
+    def match(
+        self,
+        source_values: List[str],
+        target_values: List[str],
+    ) -> Union[List[ValueMatch], ValueMatches]:
+        index = self._get_index(target_values)
+        candidates = index.candidates(
+            source_values, self.blocking_threshold, chunk_size=self.chunk_size
+        )
+        has_candidates = [i for i, c in enumerate(candidates) if len(c) > 0]
+        if len(has_candidates) == 0:
+            return []
+
+        if self._scorer is not None:
+            return self._score_candidates(
+                [source_values[i] for i in has_candidates],
+                target_values,
+                [candidates[i] for i in has_candidates],
+            )
+
+        results: List[ValueMatch] = []
+        for start in range(0, len(has_candidates), self.chunk_size):
+            chunk = has_candidates[start : start + self.chunk_size]
+            positions = np.unique(np.concatenate([candidates[i] for i in chunk]))
+            results.extend(
+                self.matcher.match(
+                    [source_values[i] for i in chunk],
+                    [target_values[i] for i in positions],
+                )
+            )
+
+        results.sort(key=lambda match: match.similarity, reverse=True)
+        return results
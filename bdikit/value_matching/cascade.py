@@ -0,0 +1,185 @@
+import time
+import inspect
+import threading
+import pandas as pd
+from typing import Any, Dict, List, Mapping, Sequence, Tuple, Union
+from bdikit.value_matching.base import BaseValueMatcher, ValueMatch
+from bdikit.value_matching.matcher_factory import ValueMatchers
+from bdikit.config import VALUE_MATCHING_THRESHOLD
+
+# A stage of the cascade: a value matcher (or its name in ValueMatchers), the
+# minimum similarity for its matches to be accepted and, optionally, the
+# arguments of the matcher if it is created from its name
+StageSpec = Union[
+    Tuple[Union[str, BaseValueMatcher], float],
+    Tuple[str, float, Mapping[str, Any]],
+]
+
+DEFAULT_CASCADE_STAGES: List[StageSpec] = [
+    ("exact", 1.0),
+    ("edit_distance", 0.9),
+    ("tfidf", 0.8),
+]
+
+
+class CascadeValueMatcher(BaseValueMatcher):
+    """
+    Value matching algorithm that runs a cascade of value matchers, e.g.,
+    exact -> edit_distance -> tfidf -> embedding -> gpt. Each stage only
+    receives the source values whose matches were not accepted by the previous
+    stages, i.e., values whose best match has a similarity below the acceptance
+    threshold of the stage. Slow or costly stages (e.g., embedding or gpt)
+    placed at the end of the cascade therefore only see the hard values.
+
+    Values that are not accepted by any stage get the matches of the stage
+    that found their most similar target value, as long as its similarity is
+    at least `threshold`.
+
+    The number of values received and accepted by each stage and the time
+    spent in it are accumulated and returned by get_stats(). Note that the
+    statistics of matchers sent to worker processes stay in the workers.
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[StageSpec] = DEFAULT_CASCADE_STAGES,
+        threshold: float = VALUE_MATCHING_THRESHOLD,
+        top_k: int = 1,
+    ):
+        """
+        Args:
+            stages (Sequence[StageSpec], optional): The stages of the cascade,
+                in order, as (matcher, acceptance_threshold) or (matcher name,
+                acceptance_threshold, matcher arguments) tuples. Matchers
+                created from their names get the `threshold` and `top_k` of
+                the cascade unless other values are given in their arguments.
+            threshold (float, optional): The minimum similarity of the matches
+                of values that are not accepted by any stage.
+            top_k (int, optional): The maximum number of matches of each
+                source value, for the stages that support it.
+        """
+        if len(stages) == 0:
+            raise ValueError("The cascade must have at least one stage")
+        self.threshold = threshold
+        self.top_k = top_k
+        self.stages: List[Tuple[str, BaseValueMatcher, float]] = [
+            self._create_stage(stage) for stage in stages
+        ]
+        self._stats: List[Dict[str, Any]] = [
+            {
+                "stage": name,
+                "acceptance_threshold": acceptance_threshold,
+                "values": 0,
+                "accepted": 0,
+                "seconds": 0.0,
+            }
+            for name, _, acceptance_threshold in self.stages
+        ]
+        self._stats_lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_stats_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._stats_lock = threading.Lock()
+
+    def _create_stage(self, stage: StageSpec) -> Tuple[str, BaseValueMatcher, float]:
+        if not isinstance(stage, (tuple, list)) or len(stage) not in (2, 3):
+            raise ValueError(
+                "Each stage must be a (matcher, acceptance_threshold) or a "
+                "(matcher name, acceptance_threshold, matcher arguments) tuple"
+            )
+        matcher, acceptance_threshold = stage[0], float(stage[1])
+        matcher_args = dict(stage[2]) if len(stage) == 3 else {}
+
+        if isinstance(matcher, str):
+            name = matcher
+            matcher_class = ValueMatchers.get_matcher_class(name)
+            parameters = inspect.signature(matcher_class).parameters
+            for parameter, value in [
+                ("threshold", self.threshold),
+                ("top_k", self.top_k),
+            ]:
+                if parameter in parameters:
+                    matcher_args.setdefault(parameter, value)
+            matcher = matcher_class(**matcher_args)
+        elif isinstance(matcher, BaseValueMatcher):
+            if len(matcher_args) > 0:
+                raise ValueError(
+                    "Matcher arguments can only be given for matchers created "
+                    "from their names"
+                )
+            name = type(matcher).__name__
+        else:
+            raise ValueError(
+                "The matcher of a stage must be a string or an instance of "
+                "BaseValueMatcher"
+            )
+
+        return name, matcher, acceptance_threshold
+
+    def match(
+        self,
+        source_values: List[str],
+        target_values: List[str],
+    ) -> List[ValueMatch]:
+        remaining = list(source_values)
+        accepted_matches: List[ValueMatch] = []
+        # the matches of the stage with the most similar target value of each
+        # value that has not been accepted yet
+        best_matches: Dict[str, List[ValueMatch]] = {}
+
+        for i, (_, matcher, acceptance_threshold) in enumerate(self.stages):
+            if len(remaining) == 0:
+                break
+
+            start = time.perf_counter()
+            stage_matches: Dict[str, List[ValueMatch]] = {}
+            for match in matcher.match(remaining, target_values):
+                stage_matches.setdefault(match.source_value, []).append(match)
+            elapsed = time.perf_counter() - start
+
+            next_remaining = []
+            for source_value in remaining:
+                matches = stage_matches.get(source_value, [])
+                similarity = max((m.similarity for m in matches), default=None)
+                if similarity is not None and similarity >= acceptance_threshold:
+                    accepted_matches.extend(matches)
+                    best_matches.pop(source_value, None)
+                    continue
+                next_remaining.append(source_value)
+                if similarity is not None and similarity > max(
+                    (m.similarity for m in best_matches.get(source_value, [])),
+                    default=float("-inf"),
+                ):
+                    best_matches[source_value] = matches
+
+            with self._stats_lock:
+                self._stats[i]["values"] += len(remaining)
+                self._stats[i]["accepted"] += len(remaining) - len(next_remaining)
+                self._stats[i]["seconds"] += elapsed
+            remaining = next_remaining
+
+        for matches in best_matches.values():
+            accepted_matches.extend(
+                m for m in matches if m.similarity >= self.threshold
+            )
+
+        accepted_matches.sort(key=lambda match: match.similarity, reverse=True)
+        return accepted_matches
+
+    def get_stats(self) -> pd.DataFrame:
+        """
+        Returns the number of source values received and accepted by each
+        stage, and the time (in seconds) spent in it.
+        """
+        with self._stats_lock:
+            return pd.DataFrame([dict(stage_stats) for stage_stats in self._stats])
+
+    def reset_stats(self):
+        with self._stats_lock:
+            for stage_stats in self._stats:
+                stage_stats.update(values=0, accepted=0, seconds=0.0)
@@ -0,0 +1,47 @@
+from typing import Dict, List
+from bdikit.value_matching.base import BaseValueMatcher, ValueMatch
+
+
+def normalize_value(value: str) -> str:
+    """
+    Returns the value in lower case (casefolded), with leading and trailing
+    whitespace removed and inner runs of whitespace collapsed to one space.
+    """
+    return " ".join(value.split()).casefold()
+
+
+class ExactValueMatcher(BaseValueMatcher):
+    """
+    Value matching algorithm that matches source values to equal target values
+    with a hash lookup (with similarity 1.0). If `normalize` is True, values
+    that only differ by case or whitespace (see normalize_value) also match.
+    Source values without an exact match are left unmatched.
+    """
+
+    def __init__(self, normalize: bool = True):
+        self.normalize = normalize
+
+    def match(
+        self,
+        source_values: List[str],
+        target_values: List[str],
+    ) -> List[ValueMatch]:
+        target_values_set = set(target_values)
+        normalized_targets: Dict[str, str] = {}
+        if self.normalize:
+            for target_value in target_values:
+                # the first target value wins if several normalize the same
+                normalized_targets.setdefault(
+                    normalize_value(target_value), target_value
+                )
+
+        matches = []
+        for source_value in source_values:
+            if source_value in target_values_set:
+                matches.append(ValueMatch(source_value, source_value, 1.0))
+            elif self.normalize:
+                target_value = normalized_targets.get(normalize_value(source_value))
+                if target_value is not None:
+                    matches.append(ValueMatch(source_value, target_value, 1.0))
+
+        return matches
@@ -1,16 +1,58 @@
-from typing import List
-from openai import OpenAI
+import ast
+import json
+from typing import Any, List, Optional, Set
 from bdikit.value_matching.base import BaseValueMatcher, ValueMatch
 from bdikit.config import VALUE_MATCHING_THRESHOLD
+from bdikit.llm import LLMResponseCache, BDIKIT_LLM_CACHE_PATH, Messages, complete_all
+
+SYSTEM_PROMPT = (
+    "You are an intelligent system that given a term, you have to choose a value from a list that best matches the term. "
+    "These terms belong to the medical domain, and the list contains terms in the Genomics Data Commons (GDC) format."
+)
 
 
 class GPTValueMatcher(BaseValueMatcher):
     def __init__(
         self,
         threshold: float = VALUE_MATCHING_THRESHOLD,
+        model: str = "gpt-4-turbo-preview",
+        batch_size: int = 1,
+        max_workers: int = 8,
+        max_retries: int = 5,
+        use_cache: bool = True,
+        cache_path: str = BDIKIT_LLM_CACHE_PATH,
+        client: Optional[Any] = None,
     ):
-        self.client = OpenAI()
+        """
+        Args:
+            threshold (float, optional): The minimum similarity score of the
+                returned matches.
+            model (str, optional): The name of the OpenAI model.
+            batch_size (int, optional): The number of source values matched in
+                each prompt. Larger batches send the target values fewer times.
+            max_workers (int, optional): The maximum number of concurrent
+                requests.
+            max_retries (int, optional): The number of times a request is
+                retried after a rate limit, connection or server error.
+            use_cache (bool, optional): Whether responses are stored in (and
+                reused from) a persistent cache keyed by model and prompt.
+            cache_path (str, optional): The path of the cache database.
+            client (optional): An OpenAI-compatible client. Defaults to
+                openai.OpenAI().
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if client is None:
+            from openai import OpenAI
+
+            client = OpenAI()
+        self.client = client
         self.threshold = threshold
+        self.model = model
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.cache = LLMResponseCache(cache_path) if use_cache else None
 
     def match(
         self,
@@ -18,37 +60,90 @@ class GPTValueMatcher(BaseValueMatcher):
         target_values: List[str],
     ) -> List[ValueMatch]:
         target_values_set = set(target_values)
+        batches = [
+            source_values[i : i + self.batch_size]
+            for i in range(0, len(source_values), self.batch_size)
+        ]
+        prompts = [self._create_prompt(batch, target_values) for batch in batches]
+        responses = complete_all(
+            self.client,
+            self.model,
+            prompts,
+            max_workers=self.max_workers,
+            max_retries=self.max_retries,
+            cache=self.cache,
+        )
+
         matches = []
+        for batch, response_message in zip(batches, responses):
+            if response_message is None:
+                continue
+            matches.extend(
+                self._parse_response(batch, response_message, target_values_set)
+            )
+
+        return matches
 
-        for source_value in source_values:
-            completion = self.client.chat.completions.create(
-                model="gpt-4-turbo-preview",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an intelligent system that given a term, you have to choose a value from a list that best matches the term. "
-                        "These terms belong to the medical domain, and the list contains terms in the Genomics Data Commons (GDC) format.",
-                    },
-                    {
-                        "role": "user",
-                        "content": f'For the term: "{source_value}", choose a value from this list {target_values}. '
-                        "Return the value from the list with a similarity score, between 0 and 1, with 1 indicating the highest similarity. "
-                        "DO NOT PROVIDE ANY OTHER OUTPUT TEXT OR EXPLANATION. "
-                        'Only provide a Python dictionary. For example {"term": "term from the list", "score": 0.8}.',
-                    },
-                ],
+    def _create_prompt(
+        self, source_values: List[str], target_values: List[str]
+    ) -> Messages:
+        if len(source_values) == 1:
+            user_prompt = (
+                f'For the term: "{source_values[0]}", choose a value from this list {target_values}. '
+                "Return the value from the list with a similarity score, between 0 and 1, with 1 indicating the highest similarity. "
+                "DO NOT PROVIDE ANY OTHER OUTPUT TEXT OR EXPLANATION. "
+                'Only provide a Python dictionary. For example {"term": "term from the list", "score": 0.8}.'
             )
+        else:
+            user_prompt = (
+                f"For each of the terms {json.dumps(source_values)}, choose a value from this list {target_values}. "
+                "Return, for each term, the value from the list with a similarity score, between 0 and 1, with 1 indicating the highest similarity. "
+                "DO NOT PROVIDE ANY OTHER OUTPUT TEXT OR EXPLANATION. "
+                "Only provide a Python list of dictionaries, one for each term in the same order. "
+                'For example [{"source": "first term", "term": "term from the list", "score": 0.8}].'
+            )
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ]
+
+    def _parse_response(
+        self,
+        source_values: List[str],
+        response_message: str,
+        target_values_set: Set[str],
+    ) -> List[ValueMatch]:
+        try:
+            response = ast.literal_eval(response_message.strip())
+            if isinstance(response, dict):
+                response = [response]
+            if len(source_values) == 1:
+                response_dicts = [(source_values[0], response[0])]
+            else:
+                source_values_set = set(source_values)
+                response_dicts = [
+                    (
+                        (
+                            response_dict["source"]
+                            if response_dict.get("source") in source_values_set
+                            else source_value
+                        ),
+                        response_dict,
+                    )
+                    for source_value, response_dict in zip(source_values, response)
+                ]
+        except Exception:
+            print(f"Errors parsing response for {source_values}: {response_message}")
+            return []
 
-            response_message = completion.choices[0].message.content
+        matches = []
+        for source_value, response_dict in response_dicts:
             try:
-                response_dict = ast.literal_eval(response_message)
                 target_value = response_dict["term"]
                 score = float(response_dict["score"])
                 if target_value in target_values_set and score >= self.threshold:
                     matches.append(ValueMatch(source_value, target_value, score))
-            except:
-                print(
-                    f'Errors parsing response for "{source_value}": {response_message}'
-                )
+            except Exception:
+                print(f'Errors parsing response for "{source_value}": {response_dict}')
 
         return matches
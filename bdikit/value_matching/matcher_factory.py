@@ -1,6 +1,6 @@
 import importlib
 from enum import Enum
-from typing import Mapping, Any
+from typing import Mapping, Any, Type
 from bdikit.value_matching.base import BaseValueMatcher
 
 
@@ -10,6 +10,10 @@ class ValueMatchers(Enum):
         "edit_distance",
         "bdikit.value_matching.polyfuzz.EditDistanceValueMatcher",
     )
+    RAPIDFUZZ = (
+        "rapidfuzz",
+        "bdikit.value_matching.rapidfuzz.RapidFuzzValueMatcher",
+    )
     EMBEDDINGS = (
         "embedding",
         "bdikit.value_matching.polyfuzz.EmbeddingValueMatcher",
@@ -19,15 +23,22 @@ class ValueMatchers(Enum):
         "bdikit.value_matching.polyfuzz.FastTextValueMatcher",
     )
     GPT = ("gpt", "bdikit.value_matching.gpt.GPTValueMatcher")
+    EXACT = ("exact", "bdikit.value_matching.exact.ExactValueMatcher")
+    BLOCKING = (
+        "blocking",
+        "bdikit.value_matching.blocking.BlockingValueMatcher",
+    )
+    CASCADE = (
+        "cascade",
+        "bdikit.value_matching.cascade.CascadeValueMatcher",
+    )
 
     def __init__(self, matcher_name: str, matcher_path: str):
         self.matcher_name = matcher_name
         self.matcher_path = matcher_path
 
     @staticmethod
-    def get_matcher(
-        matcher_name: str, **matcher_kwargs: Mapping[str, Any]
-    ) -> BaseValueMatcher:
+    def get_matcher_class(matcher_name: str) -> Type[BaseValueMatcher]:
         if matcher_name not in matchers:
             names = ", ".join(list(matchers.keys()))
             raise ValueError(
@@ -38,7 +49,13 @@ class ValueMatchers(Enum):
         module_path, class_name = matchers[matcher_name].rsplit(".", 1)
         module = importlib.import_module(module_path)
 
-        return getattr(module, class_name)(**matcher_kwargs)
+        return getattr(module, class_name)
+
+    @staticmethod
+    def get_matcher(
+        matcher_name: str, **matcher_kwargs: Mapping[str, Any]
+    ) -> BaseValueMatcher:
+        return ValueMatchers.get_matcher_class(matcher_name)(**matcher_kwargs)
 
 
 matchers = {method.matcher_name: method.matcher_path for method in ValueMatchers}
@@ -0,0 +1,133 @@
+import json
+import hashlib
+import functools
+from os.path import join
+from typing import Any, Dict, List, Mapping, Sequence, Tuple, Union
+from bdikit.download import BDIKIT_CACHE_DIR
+from bdikit.utils import SQLiteCache
+from bdikit.value_matching.base import BaseValueMatcher
+
+BDIKIT_VALUE_MATCHES_CACHE_PATH = join(
+    BDIKIT_CACHE_DIR, "value_matching", "matches.sqlite"
+)
+
+# The ranked matches of a source value, as (target value, similarity) pairs
+RankedMatches = List[Tuple[str, float]]
+
+
+class ValueMatchStore(SQLiteCache):
+    """
+    Persistent memo of value matches, stored in an SQLite database that many
+    processes can share. For each matcher configuration and target domain, it
+    maps every (normalized) source value that has been matched to its ranked
+    matches, which may be empty. Values already in the store do not need to be
+    scored again when a new version of a source dataset is matched.
+    """
+
+    schema = (
+        "CREATE TABLE IF NOT EXISTS value_matches ("
+        "matcher TEXT NOT NULL, "
+        "domain TEXT NOT NULL, "
+        "source_value TEXT NOT NULL, "
+        "matches TEXT NOT NULL, "
+        "PRIMARY KEY (matcher, domain, source_value))"
+    )
+
+    def __init__(self, path: str = BDIKIT_VALUE_MATCHES_CACHE_PATH):
+        super().__init__(path)
+
+    def get(
+        self, matcher_key: str, domain_key: str, source_values: Sequence[str]
+    ) -> Dict[str, RankedMatches]:
+        """
+        Returns the ranked matches of the source values that are in the store.
+        """
+        rows = self._execute_in(
+            "SELECT source_value, matches FROM value_matches "
+            "WHERE matcher = ? AND domain = ? AND source_value IN ({})",
+            source_values,
+            (matcher_key, domain_key),
+        )
+        return {
+            source_value: [
+                (target_value, similarity)
+                for target_value, similarity in json.loads(matches)
+            ]
+            for source_value, matches in rows
+        }
+
+    def put(
+        self,
+        matcher_key: str,
+        domain_key: str,
+        matches: Mapping[str, RankedMatches],
+    ):
+        """
+        Stores the ranked matches of each source value.
+        """
+        self._executemany(
+            "INSERT OR REPLACE INTO value_matches VALUES (?, ?, ?, ?)",
+            [
+                (matcher_key, domain_key, source_value, json.dumps(ranked_matches))
+                for source_value, ranked_matches in matches.items()
+            ],
+        )
+
+
+def _describe(value: Any, depth: int = 0) -> Any:
+    """
+    Returns a JSON-serializable description of an argument or attribute of a
+    value matcher, or None if it cannot be described (e.g., a model).
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_describe(item, depth) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _describe(item, depth) for key, item in value.items()}
+    if isinstance(value, functools.partial):
+        return {
+            "func": _describe(value.func, depth),
+            "args": _describe(value.args, depth),
+            "keywords": _describe(value.keywords, depth),
+        }
+    if callable(value) and hasattr(value, "__qualname__"):
+        return f"{getattr(value, '__module__', '')}.{value.__qualname__}"
+    if isinstance(value, BaseValueMatcher) and depth < 3:
+        cls = type(value)
+        return {
+            "class": f"{cls.__module__}.{cls.__qualname__}",
+            "attributes": {
+                name: _describe(attribute, depth + 1)
+                for name, attribute in sorted(vars(value).items())
+                if not name.startswith("_")
+            },
+        }
+    return None
+
+
+def get_matcher_key(
+    method: Union[str, BaseValueMatcher], method_args: Mapping[str, Any]
+) -> str:
+    """
+    Returns the key of the matcher configuration in the store: the method name
+    and its arguments, or the class and the public (describable) attributes of
+    a matcher instance.
+    """
+    if isinstance(method, str):
+        description = {"method": method, "args": _describe(dict(method_args))}
+    else:
+        description = _describe(method)
+    return json.dumps(description, sort_keys=True)
+
+
+def get_domain_key(target_column: str, target_values: Sequence[str]) -> str:
+    """
+    Returns the key of a target domain in the store: the target column and a
+    digest of its values, so that matches are not reused after the domain
+    changes (e.g., in a new version of a standard).
+    """
+    digest = hashlib.sha256(
+        json.dumps([str(value) for value in target_values]).encode()
+    ).hexdigest()
+    return f"{target_column}:{digest}"
@@ -1,9 +1,15 @@
+import copy
 import flair
 import torch
+import numpy as np
+from collections import Counter
+from functools import lru_cache, partial
 from rapidfuzz import fuzz
 from polyfuzz import PolyFuzz
-from typing import List, Callable, Tuple
-from bdikit.value_matching.base import BaseValueMatcher, ValueMatch
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import TfidfVectorizer
+from typing import List, Callable, Tuple, Union
+from bdikit.value_matching.base import BaseValueMatcher, ValueMatch, ValueMatches
 from polyfuzz.models import EditDistance, TFIDF, Embeddings
 from flair.embeddings import TransformerWordEmbeddings, WordEmbeddings
 from bdikit.config import get_device, VALUE_MATCHING_THRESHOLD
@@ -25,27 +31,134 @@ class PolyFuzzValueMatcher(BaseValueMatcher):
         self,
         source_values: List[str],
         target_values: List[str],
-    ) -> List[ValueMatch]:
+    ) -> ValueMatches:
 
-        self.model.match(source_values, target_values)
-        match_results = self.model.get_matches()
+        # PolyFuzz models store the results of the last call (and their fitted
+        # state), so calls are run on shallow copies to keep the matcher
+        # thread-safe (e.g., when match_values() uses a thread pool)
+        model = copy.copy(self.model)
+        model.method = copy.copy(self.model.method)
+        model.match(source_values, target_values)
+        match_results = model.get_matches()
         match_results.sort_values(by="Similarity", ascending=False, inplace=True)
 
-        matches = []
-        for _, row in match_results.iterrows():
-            source = row[0]
-            top_matches = row[1:]
-            indexes = range(0, len(top_matches) - 1, 2)
+        # The result frame has a "From" column followed by (To, Similarity)
+        # column pairs, one for each of the top matches of the source value
+        n_pairs = (match_results.shape[1] - 1) // 2
+        targets = match_results.iloc[:, 1 : 2 * n_pairs : 2].to_numpy(dtype=object)
+        similarities = match_results.iloc[:, 2 : 2 * n_pairs + 1 : 2].to_numpy(
+            dtype=np.float64
+        )
+        rows, columns = np.nonzero(similarities >= self.threshold)
+
+        return ValueMatches(
+            match_results.iloc[:, 0].to_numpy(dtype=object)[rows],
+            targets[rows, columns],
+            similarities[rows, columns],
+        )
+
+
+class TFIDFTargetIndex:
+    """
+    TF-IDF vectors of the values of a target domain, using the same character
+    n-grams as PolyFuzz's TFIDF model. The vocabulary and the IDF weights are
+    fitted on the target values only, so the index can be reused to match any
+    number of source domains: at query time, only the source values are
+    transformed. N-grams of the source values that do not occur in the target
+    domain do not contribute to the similarities, but still count towards the
+    norms of the source vectors (with the IDF of an unseen n-gram).
+    """
+
+    def __init__(
+        self,
+        target_values: List[str],
+        n_gram_range: Tuple[int, int] = (1, 3),
+        clean_string: bool = True,
+    ):
+        self.target_values = list(target_values)
+        self.analyzer = TFIDF(
+            n_gram_range=n_gram_range, clean_string=clean_string
+        )._create_ngrams
+        self.vectorizer = TfidfVectorizer(min_df=1, analyzer=self.analyzer)
+        # rows are L2-normalized
+        self.matrix = self.vectorizer.fit_transform(self.target_values)
+        self.vocabulary = self.vectorizer.vocabulary_
+        self.idf = self.vectorizer.idf_
+        # idf of n-grams with document frequency 0 (smooth_idf is enabled)
+        self.unseen_idf = np.log(1 + len(self.target_values)) + 1
 
-            for index in indexes:
-                target = top_matches[index]
-                similarity = top_matches[index + 1]
-                if similarity >= self.threshold:
-                    matches.append(ValueMatch(source, target, similarity))
+    def transform(self, source_values: List[str]) -> csr_matrix:
+        indptr = [0]
+        indices: List[int] = []
+        data: List[float] = []
+        for value in source_values:
+            squared_norm = 0.0
+            for ngram, count in Counter(self.analyzer(value)).items():
+                column = self.vocabulary.get(ngram)
+                weight = count * (
+                    self.idf[column] if column is not None else self.unseen_idf
+                )
+                squared_norm += weight * weight
+                if column is not None:
+                    indices.append(column)
+                    data.append(weight)
+            start = indptr[-1]
+            if squared_norm > 0:
+                norm = np.sqrt(squared_norm)
+                for i in range(start, len(data)):
+                    data[i] /= norm
+            indptr.append(len(indices))
 
+        return csr_matrix(
+            (data, indices, indptr),
+            shape=(len(source_values), len(self.vocabulary)),
+            dtype=np.float64,
+        )
+
+    def match(
+        self, source_values: List[str], threshold: float, top_k: int = 1
+    ) -> List[ValueMatch]:
+        """
+        Returns the top-k target values of each source value with a cosine
+        similarity greater than or equal to the threshold.
+        """
+        if len(source_values) == 0 or len(self.target_values) == 0:
+            return []
+
+        similarities = (self.transform(source_values) @ self.matrix.T).tocsr()
+        matches = []
+        for row, source_value in enumerate(source_values):
+            start, end = similarities.indptr[row], similarities.indptr[row + 1]
+            scores = similarities.data[start:end]
+            columns = similarities.indices[start:end]
+            candidates = np.flatnonzero(scores >= threshold)
+            order = candidates[np.argsort(-scores[candidates], kind="stable")]
+            for i in order[:top_k]:
+                matches.append(
+                    ValueMatch(
+                        source_value,
+                        self.target_values[columns[i]],
+                        float(scores[i]),
+                    )
+                )
+
+        matches.sort(key=lambda match: match.similarity, reverse=True)
         return matches
 
 
+@lru_cache(maxsize=128)
+def get_tfidf_target_index(
+    target_values: Tuple[str, ...],
+    n_gram_range: Tuple[int, int] = (1, 3),
+    clean_string: bool = True,
+) -> TFIDFTargetIndex:
+    """
+    Returns the TF-IDF index of the target domain, which is fitted only once per
+    process for each domain and configuration.
+    """
+    return TFIDFTargetIndex(list(target_values), tuple(n_gram_range), clean_string)
+
+
 class TFIDFValueMatcher(PolyFuzzValueMatcher):
     """
     Value matching algorithm based on the TF-IDF similarity between values.
@@ -58,8 +171,20 @@ class TFIDFValueMatcher(PolyFuzzValueMatcher):
         threshold: float = VALUE_MATCHING_THRESHOLD,
         top_k: int = 1,
         cosine_method: str = "sparse",
+        cache_target_index: bool = False,
     ):
-
+        """
+        Args:
+            cache_target_index (bool, optional): If True, the TF-IDF model is
+                fitted on the target values only and cached (see
+                TFIDFTargetIndex), so that matching the same target domain
+                against many source domains does not refit it. If False, the
+                model is fitted on the source and target values of each call.
+        """
+        self.n_gram_range = tuple(n_gram_range)
+        self.clean_string = clean_string
+        self.top_k = top_k
+        self.cache_target_index = cache_target_index
         super().__init__(
             PolyFuzz(
                 method=TFIDF(
@@ -73,6 +198,25 @@ class TFIDFValueMatcher(PolyFuzzValueMatcher):
             threshold,
         )
 
+    def match(
+        self,
+        source_values: List[str],
+        target_values: List[str],
+    ) -> Union[List[ValueMatch], ValueMatches]:
+        if not self.cache_target_index:
+            return super().match(source_values, target_values)
+
+        index = get_tfidf_target_index(
+            tuple(target_values), self.n_gram_range, self.clean_string
+        )
+        return index.match(source_values, self.threshold, self.top_k)
+
+
+def _normalized_score(
+    scorer: Callable[[str, str], float], str1: str, str2: str
+) -> float:
+    return scorer(str1, str2) / 100.0
+
 
 class EditDistanceValueMatcher(PolyFuzzValueMatcher):
     """
@@ -85,8 +229,10 @@ class EditDistanceValueMatcher(PolyFuzzValueMatcher):
         n_jobs: int = -1,
         threshold: float = VALUE_MATCHING_THRESHOLD,
     ):
-        # Return scores between 0 and 1
-        normalized_scorer = lambda str1, str2: scorer(str1, str2) / 100.0
+        # Return scores between 0 and 1 (partial objects, unlike lambdas, can be
+        # pickled and sent to worker processes)
+        normalized_scorer = partial(_normalized_score, scorer)
+        self.scorer = scorer
         super().__init__(
             PolyFuzz(
                 method=EditDistance(
@@ -109,6 +255,8 @@ class EmbeddingValueMatcher(PolyFuzzValueMatcher):
         top_k: int = 1,
         cosine_method: str = "sparse",
     ):
+        self.model_name = model_name
+        self.top_k = top_k
         embeddings = TransformerWordEmbeddings(model_name)
         method = Embeddings(
             embeddings,
@@ -131,6 +279,8 @@ class FastTextValueMatcher(PolyFuzzValueMatcher):
         top_k: int = 1,
         cosine_method: str = "sparse",
     ):
+        self.model_name = model_name
+        self.top_k = top_k
         embeddings = WordEmbeddings(model_name)
         method = Embeddings(
             embeddings,
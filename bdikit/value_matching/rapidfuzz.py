@@ -0,0 +1,93 @@
+import numpy as np
+from rapidfuzz import fuzz, process
+from typing import Callable, List
+from bdikit.value_matching.base import BaseValueMatcher, ValueMatch
+from bdikit.config import VALUE_MATCHING_THRESHOLD
+
+
+class RapidFuzzValueMatcher(BaseValueMatcher):
+    """
+    Value matching algorithm based on the edit distance between values. Unlike
+    EditDistanceValueMatcher, the scores of all pairs of values are computed at
+    once with rapidfuzz.process.cdist, which runs in native code using multiple
+    threads, and the top-k matches of each source value are returned.
+    """
+
+    def __init__(
+        self,
+        scorer: Callable[..., float] = fuzz.ratio,
+        threshold: float = VALUE_MATCHING_THRESHOLD,
+        top_k: int = 1,
+        n_jobs: int = -1,
+        max_chunk_size: int = 16_000_000,
+    ):
+        """
+        Args:
+            scorer (Callable, optional): A rapidfuzz scorer that returns
+                similarities between 0 and 100 (e.g., fuzz.ratio or fuzz.WRatio).
+            threshold (float, optional): The minimum similarity (between 0 and 1)
+                of the returned matches.
+            top_k (int, optional): The maximum number of matches returned for
+                each source value.
+            n_jobs (int, optional): The number of threads used to compute the
+                scores, or -1 to use all cores.
+            max_chunk_size (int, optional): The maximum number of scores computed
+                at once, which bounds the memory used by the score matrix.
+        """
+        if top_k < 1:
+            raise ValueError("top_k must be at least 1")
+        self.scorer = scorer
+        self.threshold = threshold
+        self.top_k = top_k
+        self.n_jobs = n_jobs
+        self.max_chunk_size = max_chunk_size
+
+    def match(
+        self,
+        source_values: List[str],
+        target_values: List[str],
+    ) -> List[ValueMatch]:
+        if len(source_values) == 0 or len(target_values) == 0:
+            return []
+
+        # The cutoff is slightly relaxed to avoid discarding scores equal to the
+        # threshold due to rounding (e.g., 0.3 * 100 > 30), the threshold itself
+        # is applied below to the normalized scores
+        score_cutoff = max(0.0, self.threshold * 100 - 1e-6)
+        top_k = min(self.top_k, len(target_values))
+        chunk_size = max(1, self.max_chunk_size // len(target_values))
+
+        matches = []
+        for start in range(0, len(source_values), chunk_size):
+            chunk = source_values[start : start + chunk_size]
+            # scores below the cutoff are set to 0
+            scores = process.cdist(
+                chunk,
+                target_values,
+                scorer=self.scorer,
+                score_cutoff=score_cutoff,
+                dtype=np.float64,
+                workers=self.n_jobs,
+            )
+
+            if top_k == 1:
+                top_indices = np.argmax(scores, axis=1)[:, np.newaxis]
+            else:
+                top_indices = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+                top_scores = np.take_along_axis(scores, top_indices, axis=1)
+                order = np.argsort(-top_scores, axis=1, kind="stable")
+                top_indices = np.take_along_axis(top_indices, order, axis=1)
+            top_scores = np.take_along_axis(scores, top_indices, axis=1) / 100.0
+
+            rows, columns = np.nonzero(top_scores >= self.threshold)
+            for row, column in zip(rows, columns):
+                matches.append(
+                    ValueMatch(
+                        chunk[row],
+                        target_values[top_indices[row, column]],
+                        float(top_scores[row, column]),
+                    )
+                )
+
+        matches.sort(key=lambda match: match.similarity, reverse=True)
+        return matches
@@ -0,0 +1,75 @@
+"""
+Measures the time and memory needed to import bdikit and checks that heavy
+optional dependencies (e.g., torch, transformers, panel, IPython) are not loaded
+at import time, since they are only needed by some matchers and by
+view_value_matches(). Each import is measured in a fresh interpreter.
+
+Exits with a non-zero status if a heavy dependency is loaded by the import or if
+the median import time exceeds --max-seconds, so it can be used to catch
+import-time regressions.
+
+Usage: python scripts/benchmark_import_time.py [--module bdikit.api] [--runs 5]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+
+HEAVY_MODULES = [
+    "torch",
+    "transformers",
+    "panel",
+    "IPython",
+    "openai",
+    "polyfuzz",
+    "flair",
+    "valentine",
+]
+
+MEASURE_IMPORT = """
+import json, resource, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy_modules!r} if m in sys.modules]
+max_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"seconds": elapsed, "heavy": heavy, "max_rss_kb": max_rss_kb}}))
+"""
+
+
+def measure(module: str) -> dict:
+    code = MEASURE_IMPORT.format(module=module, heavy_modules=HEAVY_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--module", default="bdikit.api")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    # the first run warms up the OS file cache and the bytecode cache
+    measure(args.module)
+    results = [measure(args.module) for _ in range(args.runs)]
+
+    seconds = statistics.median(result["seconds"] for result in results)
+    max_rss_mb = max(result["max_rss_kb"] for result in results) / 1024
+    heavy = sorted(set(module for result in results for module in result["heavy"]))
+
+    print(f"import {args.module}: {seconds:.3f}s (median of {args.runs} runs)")
+    print(f"max RSS: {max_rss_mb:.0f} MB")
+    print(f"heavy modules loaded: {', '.join(heavy) if heavy else 'none'}")
+
+    if heavy or seconds > args.max_seconds:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
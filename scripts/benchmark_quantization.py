@@ -0,0 +1,114 @@
+"""
+Compares the dynamic int8 quantized contrastive learning model against the
+fp32 model on the example datasets. For each dataset, it reports the
+embedding throughput of both models and how much the top-k target columns
+(GDC and the example target table) computed with the quantized model agree
+with the ones computed with the fp32 model.
+
+Usage: python scripts/benchmark_quantization.py [--top-k 10] [--backend eager]
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from os.path import join, dirname
+from sklearn.metrics.pairwise import cosine_similarity
+from bdikit.api import _load_table_for_standard
+from bdikit.standards.target_schema import TargetTable
+from bdikit.models.contrastive_learning.cl_api import (
+    ContrastiveLearningAPI,
+    DEFAULT_CL_MODEL,
+)
+
+
+DATASETS_PATH = join(dirname(__file__), "../examples/datasets")
+SOURCE_DATASETS = ["dou.csv", "cao.csv"]
+TARGET_DATASET = "target.csv"
+
+
+def embed(api: ContrastiveLearningAPI, table: TargetTable):
+    """Embeds all columns of the table, bypassing the embedding caches."""
+    tables = [
+        api._sample_to_15_rows(api._column_table(table, column))
+        for column in table.columns
+    ]
+    start = time.perf_counter()
+    embeddings = api._inference_on_tables(tables)
+    return embeddings, time.perf_counter() - start
+
+
+def top_k_indices(source_embeddings, target_embeddings, top_k):
+    similarities = cosine_similarity(source_embeddings, target_embeddings)
+    return np.argsort(-similarities, axis=1)[:, :top_k]
+
+
+def agreement(expected, actual):
+    top_1 = np.mean(expected[:, 0] == actual[:, 0])
+    overlap = np.mean([len(set(e) & set(a)) / len(e) for e, a in zip(expected, actual)])
+    return top_1, overlap
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--backend", default="eager")
+    parser.add_argument("--model-name", default=DEFAULT_CL_MODEL)
+    args = parser.parse_args()
+
+    apis = {
+        "fp32": ContrastiveLearningAPI(
+            model_name=args.model_name, backend=args.backend
+        ),
+        "int8": ContrastiveLearningAPI(
+            model_name=args.model_name, backend=args.backend, quantize=True
+        ),
+    }
+
+    targets = {
+        "gdc": _load_table_for_standard("gdc"),
+        TARGET_DATASET: pd.read_csv(join(DATASETS_PATH, TARGET_DATASET)),
+    }
+    target_embeddings = {}
+    for name, api in apis.items():
+        for target_name, target in targets.items():
+            embeddings, elapsed = embed(api, target)
+            target_embeddings[name, target_name] = embeddings
+            print(
+                f"[{name}] {target_name}: {len(target.columns)} columns in {elapsed:.2f}s "
+                f"({len(target.columns) / elapsed:.1f} columns/s)"
+            )
+
+    print()
+    print(
+        f"{'dataset':<10} {'target':<12} {'fp32 col/s':>11} {'int8 col/s':>11} "
+        f"{'top-1 agr.':>11} {f'top-{args.top_k} overlap':>15}"
+    )
+    for dataset in SOURCE_DATASETS:
+        source = pd.read_csv(join(DATASETS_PATH, dataset))
+        source_embeddings = {}
+        throughput = {}
+        for name, api in apis.items():
+            source_embeddings[name], elapsed = embed(api, source)
+            throughput[name] = source.shape[1] / elapsed
+
+        for target_name in targets:
+            expected = top_k_indices(
+                source_embeddings["fp32"],
+                target_embeddings["fp32", target_name],
+                args.top_k,
+            )
+            actual = top_k_indices(
+                source_embeddings["int8"],
+                target_embeddings["int8", target_name],
+                args.top_k,
+            )
+            top_1, overlap = agreement(expected, actual)
+            print(
+                f"{dataset:<10} {target_name:<12} {throughput['fp32']:>11.1f} "
+                f"{throughput['int8']:>11.1f} {top_1:>11.2%} {overlap:>15.2%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
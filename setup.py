@@ -32,7 +32,9 @@ def get_requires():
 long_description = read_readme()
 version = read_version()
 requires = get_requires()
-extra_requires = {}
+extra_requires = {
+    'onnx': ['onnx', 'onnxruntime'],
+}
 
 setuptools.setup(
     name=package_name,
@@ -0,0 +1,24 @@
+import pytest
+from bdikit.value_matching.polyfuzz import EditDistanceValueMatcher
+
+
+class RecordingValueMatcher(EditDistanceValueMatcher):
+    """
+    Edit distance matcher that records the source values it is asked to match
+    and the number of calls.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.matched_values = []
+        self.calls = 0
+
+    def match(self, source_values, target_values):
+        self.matched_values.extend(source_values)
+        self.calls += 1
+        return super().match(source_values, target_values)
+
+
+@pytest.fixture
+def recording_value_matcher():
+    return RecordingValueMatcher
@@ -1,4 +1,6 @@
 import bdikit as bdi
+import pytest
+import pickle
 import numpy as np
 import pandas as pd
 import numpy as np
@@ -6,6 +8,8 @@ from bdikit.mapping_functions import (
     FunctionValueMapper,
     IdentityValueMapper,
 )
+from bdikit.value_matching.polyfuzz import TFIDFValueMatcher
+from bdikit.value_matching.memo import ValueMatchStore
 
 
 def test_bdi_match_schema_with_dataframes():
@@ -221,6 +225,218 @@ def test_value_mapping_dataframe():
     assert len(mapping) == len(df_source)
 
 
+def test_match_values_with_executors():
+    # given
+    df_source = pd.DataFrame(
+        {
+            "fruits": ["Red Apple", "Banana", "Oorange", "Strawberry"],
+            "colors": ["Redd", "blue", "GREEN", "yelow"],
+        }
+    )
+    df_target = pd.DataFrame(
+        {
+            "fruit_names": ["apple", "banana", "orange", "kiwi"],
+            "color_names": ["red", "blue", "green", "yellow"],
+        }
+    )
+    df_matches = pd.DataFrame(
+        {"source": ["fruits", "colors"], "target": ["fruit_names", "color_names"]}
+    )
+
+    # when
+    sequential_mappings = bdi.match_values(df_source, df_target, df_matches)
+    parallel_mappings = {
+        executor: bdi.match_values(
+            df_source, df_target, df_matches, executor=executor, max_workers=2
+        )
+        for executor in ["thread", "process"]
+    }
+
+    # then
+    for mappings in parallel_mappings.values():
+        assert [m.attrs for m in mappings] == [m.attrs for m in sequential_mappings]
+        for mapping, sequential_mapping in zip(mappings, sequential_mappings):
+            pd.testing.assert_frame_equal(
+                mapping.sort_values("source", ignore_index=True),
+                sequential_mapping.sort_values("source", ignore_index=True),
+            )
+
+    with pytest.raises(ValueError):
+        bdi.match_values(df_source, df_target, df_matches, executor="cluster")
+
+
+def test_match_values_runs_matcher_once_per_distinct_domains():
+    # given
+    class CountingValueMatcher(TFIDFValueMatcher):
+        def __init__(self):
+            super().__init__()
+            self.calls = 0
+
+        def match(self, source_values, target_values):
+            self.calls += 1
+            return super().match(source_values, target_values)
+
+    df_source = pd.DataFrame(
+        {
+            "clinical_stage": ["Stg I", "Stg II", "Stg III"],
+            "pathologic_stage": ["Stg III", "Stg I", "Stg II"],
+            "other_stage": ["Stg I", "Stg IV", "Stg II"],
+        }
+    )
+    df_target = pd.DataFrame(
+        {
+            "ajcc_clinical_stage": ["stage i", "stage ii", "stage iii"],
+            "ajcc_pathologic_stage": ["stage i", "stage ii", "stage iii"],
+        }
+    )
+    df_matches = pd.DataFrame(
+        {
+            "source": ["clinical_stage", "pathologic_stage", "other_stage"],
+            "target": [
+                "ajcc_clinical_stage",
+                "ajcc_pathologic_stage",
+                "ajcc_pathologic_stage",
+            ],
+        }
+    )
+    value_matcher = CountingValueMatcher()
+
+    # when
+    mappings = bdi.match_values(df_source, df_target, df_matches, method=value_matcher)
+
+    # then
+    assert value_matcher.calls == 2
+    assert [(m.attrs["source"], m.attrs["target"]) for m in mappings] == list(
+        df_matches.itertuples(index=False, name=None)
+    )
+    assert mappings[0]["source"].tolist() == mappings[1]["source"].tolist()
+    assert mappings[0]["target"].tolist() == mappings[1]["target"].tolist()
+    assert set(mappings[2]["source"]) == set(df_source["other_stage"])
+
+
+def test_match_values_does_not_group_equal_values_of_different_types():
+    # given
+    df_source = pd.DataFrame(
+        {
+            "a": [1, 2, "unknown"],
+            "b": [1.0, 2.0, "unknown"],
+            "c": [True, 2, "unknown"],
+        },
+        dtype=object,
+    )
+    df_target = pd.DataFrame({"code": ["1", "2", "1.0", "2.0", "True", "unknown"]})
+    df_matches = pd.DataFrame({"source": ["a", "b", "c"], "target": ["code"] * 3})
+
+    # when
+    mappings = bdi.match_values(
+        df_source, df_target, df_matches, method="edit_distance"
+    )
+
+    # then
+    for column, mapping in zip(["a", "b", "c"], mappings):
+        alone = bdi.match_values(
+            df_source[[column]], df_target, (column, "code"), method="edit_distance"
+        )
+        assert [(type(x), x) for x in mapping["source"]] == [
+            (type(x), x) for x in alone["source"]
+        ]
+        assert mapping["target"].tolist() == alone["target"].tolist()
+        assert mapping["similarity"].tolist() == alone["similarity"].tolist()
+
+
+def test_match_values_with_memo_store(tmp_path, recording_value_matcher):
+    # given
+    df_target = pd.DataFrame({"fruit_names": ["apple", "banana", "orange", "kiwi"]})
+    first_export = pd.DataFrame({"fruits": ["Aple", "Bananaa", "zzz"]})
+    second_export = pd.DataFrame({"fruits": ["Aple", "Bananaa", "zzz", "Oranje"]})
+    column_mapping = ("fruits", "fruit_names")
+    store = ValueMatchStore(str(tmp_path / "matches.sqlite"))
+
+    # when
+    first_matcher = recording_value_matcher()
+    first_matches = bdi.match_values(
+        first_export, df_target, column_mapping, method=first_matcher, memo=store
+    )
+    second_matcher = recording_value_matcher()
+    second_matches = bdi.match_values(
+        second_export,
+        df_target,
+        column_mapping,
+        method=second_matcher,
+        memo=pickle.loads(pickle.dumps(store)),
+    )
+    fresh_matches = bdi.match_values(
+        second_export, df_target, column_mapping, method=recording_value_matcher()
+    )
+
+    # then
+    assert sorted(first_matcher.matched_values) == ["Aple", "Bananaa", "zzz"]
+    assert first_matches.attrs["memo_hits"] == 0
+    assert first_matches.attrs["memo_misses"] == 3
+
+    assert second_matcher.matched_values == ["Oranje"]
+    assert second_matches.attrs["memo_hits"] == 3
+    assert second_matches.attrs["memo_misses"] == 1
+    assert "memo_hits" not in fresh_matches.attrs
+    pd.testing.assert_frame_equal(
+        second_matches.sort_values("source", ignore_index=True),
+        fresh_matches.sort_values("source", ignore_index=True),
+    )
+
+
+def test_match_values_resolves_exact_matches_before_the_method(
+    recording_value_matcher,
+):
+    # given
+    df_source = pd.DataFrame({"stage": ["Stage I", "stage ii ", "STAGE  III", "Stg 4"]})
+    df_target = pd.DataFrame(
+        {"ajcc_stage": ["Stage I", "Stage II", "Stage III", "Stage IV"]}
+    )
+    column_mapping = ("stage", "ajcc_stage")
+
+    # when
+    value_matcher = recording_value_matcher()
+    matches = bdi.match_values(
+        df_source, df_target, column_mapping, method=value_matcher
+    )
+    all_values_matcher = recording_value_matcher()
+    bdi.match_values(
+        df_source,
+        df_target,
+        column_mapping,
+        method=all_values_matcher,
+        exact_match=False,
+    )
+
+    # then
+    assert value_matcher.matched_values == ["Stg 4"]
+    assert len(all_values_matcher.matched_values) == 4
+    exact_matches = matches[matches["similarity"] == 1.0]
+    assert dict(zip(exact_matches["source"], exact_matches["target"])) == {
+        "Stage I": "Stage I",
+        "stage ii ": "Stage II",
+        "STAGE  III": "Stage III",
+    }
+
+
+def test_top_value_matches_keeps_the_alternatives_of_exact_values():
+    # given
+    df_source = pd.DataFrame({"stage": ["Stage I", "Stg II"]})
+    df_target = pd.DataFrame(
+        {"ajcc_stage": ["Stage I", "Stage II", "Stage III", "Stage IV"]}
+    )
+
+    # when
+    matches = bdi.top_value_matches(
+        df_source, df_target, ("stage", "ajcc_stage"), top_k=3, method="rapidfuzz"
+    )
+
+    # then
+    exact_value_matches = next(m for m in matches if m["source"][0] == "Stage I")
+    assert len(exact_value_matches) == 3
+    assert exact_value_matches["target"].iloc[0] == "Stage I"
+
+
 def test_end_to_end_api_integration():
     # given
     df_source = pd.DataFrame(
@@ -394,6 +610,7 @@ def test_top_value_matches():
     assert "target" in df_match.columns
     assert "similarity" in df_match.columns
 
+
 def test_preview_domain():
     # given
     source = pd.DataFrame(
@@ -427,3 +644,23 @@ def test_preview_domain():
     assert "value_name" not in preview.columns
     assert "value_description" not in preview.columns
     assert "column_description" in preview.columns
+
+
+def test_import_does_not_load_heavy_dependencies():
+    # given
+    import subprocess
+    import sys
+
+    heavy_modules = ["torch", "transformers", "panel", "IPython"]
+    code = (
+        "import sys, bdikit; "
+        f"print([m for m in {heavy_modules!r} if m in sys.modules])"
+    )
+
+    # when
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout
+
+    # then
+    assert output.strip() == "[]"
@@ -0,0 +1,329 @@
+import socket
+import pytest
+import numpy as np
+import pandas as pd
+import torch
+from os.path import isfile
+from types import SimpleNamespace
+from bdikit import download, utils
+from bdikit.api import _load_table_for_standard
+from bdikit.models.contrastive_learning.cl_api import (
+    ContrastiveLearningAPI,
+    DEFAULT_CL_MODEL,
+)
+from bdikit.models.contrastive_learning import cl_pretrained_dataset
+from bdikit.models.contrastive_learning.cl_inference import create_eager_encoder
+from bdikit.models.contrastive_learning.cl_models import BarlowTwinsSimCLR
+from bdikit.models.contrastive_learning.cl_pretrained_dataset import get_tokenizer
+from bdikit.models.registry import ModelRegistry
+from bdikit.standards.gdc import GDC
+
+
+@pytest.mark.parametrize("backend", ["torchscript", "onnx"])
+def test_inference_backends_parity_with_eager_model(backend):
+    if backend == "onnx":
+        pytest.importorskip("onnxruntime")
+
+    # given
+    table = pd.DataFrame(
+        {
+            "tumor_size": ["1.2", "3.4", "5.6"],
+            "ethnicity": ["Hispanic or Latino", "Not reported", "Unknown"],
+            "FIGO_stage": ["Stage I", "Stage IA", "Stage IA1"],
+        }
+    )
+    eager_api = ContrastiveLearningAPI(model_name=DEFAULT_CL_MODEL, backend="eager")
+    api = ContrastiveLearningAPI(model_name=DEFAULT_CL_MODEL, backend=backend)
+    tables = [
+        eager_api._sample_to_15_rows(pd.DataFrame(table[column]))
+        for column in table.columns
+    ]
+
+    # when
+    expected = eager_api._inference_on_tables(tables)
+    embeddings = api._inference_on_tables(tables)
+
+    # then
+    assert embeddings.shape == expected.shape
+    assert np.allclose(embeddings, expected, atol=1e-4)
+
+
+def test_model_registry_loads_each_model_once_and_evicts_least_recently_used():
+    # given
+    registry = ModelRegistry(max_models=2)
+    loads = []
+
+    def loader(name):
+        def load():
+            loads.append(name)
+            return object()
+
+        return load
+
+    # when
+    model_a = registry.get(("a", "cpu", "eager"), loader("a"))
+    registry.get(("b", "cpu", "eager"), loader("b"))
+    same_model_a = registry.get(("a", "cpu", "eager"), loader("a"))
+    registry.get(("c", "cpu", "eager"), loader("c"))
+
+    # then
+    assert model_a is same_model_a
+    assert loads == ["a", "b", "c"]
+    assert registry.keys() == [("a", "cpu", "eager"), ("c", "cpu", "eager")]
+
+    assert registry.unload(("a", "cpu", "eager"))
+    assert not registry.unload(("a", "cpu", "eager"))
+    assert ("a", "cpu", "eager") not in registry
+    assert len(registry) == 1
+
+
+@pytest.fixture
+def offline_dataset(monkeypatch):
+    """A PretrainTableDataset with a word-level tokenizer built in memory."""
+    from tokenizers import Tokenizer, models, pre_tokenizers
+    from transformers import PreTrainedTokenizerFast
+
+    vocab = {"<unk>": 0, "<pad>": 1, "<s>": 2, "</s>": 3}
+    for word in "stage i ii iii iv a b hispanic latino not reported".split():
+        vocab[word] = len(vocab)
+    tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    fast_tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer,
+        unk_token="<unk>",
+        pad_token="<pad>",
+        cls_token="<s>",
+        sep_token="</s>",
+    )
+    monkeypatch.setattr(
+        cl_pretrained_dataset, "get_tokenizer", lambda lm="roberta": fast_tokenizer
+    )
+    return cl_pretrained_dataset.PretrainTableDataset()
+
+
+def test_tokenize_tables_matches_tokenize(offline_dataset):
+    # given
+    tables = [
+        pd.DataFrame({"stage": ["Stage I", "Stage II", "Stage IIIA", None]}),
+        pd.DataFrame(
+            {
+                "ethnicity": ["Hispanic or Latino", "Not reported"] * 40,
+                "figo_stage": ["Stage IV"] * 80,
+            }
+        ),
+        pd.DataFrame({"empty": [""]}),
+        pd.DataFrame({"long": [" ".join(["stage iv a b"] * 50)]}),
+    ]
+
+    # when
+    tokens = offline_dataset.tokenize_tables(tables)
+
+    # then
+    assert tokens == [offline_dataset._tokenize(table)[0] for table in tables]
+
+
+def test_load_table_tokens_only_embeds_missing_columns(tmp_path, monkeypatch):
+    # given
+    monkeypatch.setattr(utils, "BDIKIT_EMBEDDINGS_CACHE_DIR", str(tmp_path))
+    api = object.__new__(ContrastiveLearningAPI)
+    api.fingerprint = utils.hash_dataframe
+    api.model_id = "test-model"
+    api.embedding_dim = 2
+    embedded_columns = []
+
+    def inference_on_tables(tables):
+        embedded_columns.extend(table.columns[0] for table in tables)
+        return np.array([[len(t.columns[0]), len(t)] for t in tables], np.float32)
+
+    api._inference_on_tables = inference_on_tables
+    table = pd.DataFrame({"stage": ["Stage I", "Stage II"], "age": [30, 40]})
+
+    # when
+    embeddings = api._load_table_tokens(table)
+    embedded_first = list(embedded_columns)
+    embedded_columns.clear()
+    added_embeddings = api._load_table_tokens(table.assign(gender=["F", "M"]))
+    embedded_added = list(embedded_columns)
+    embedded_columns.clear()
+    dropped_embeddings = api._load_table_tokens(table[["age"]])
+
+    # then
+    assert embedded_first == ["stage", "age"]
+    assert embedded_added == ["gender"]
+    assert embedded_columns == []
+    np.testing.assert_array_equal(embeddings, [[5, 2], [3, 2]])
+    np.testing.assert_array_equal(added_embeddings, [[5, 2], [3, 2], [6, 2]])
+    np.testing.assert_array_equal(dropped_embeddings, [[3, 2]])
+
+
+def test_make_batches_respects_token_budget_and_batch_size():
+    # given
+    lengths = [10, 3, 7, 3, 10, 1, 0, 8]
+    settings = SimpleNamespace(batch_size=3, batch_tokens=20)
+
+    # when
+    batches = ContrastiveLearningAPI._make_batches(settings, lengths)
+
+    # then
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+    for batch in batches:
+        assert len(batch) <= settings.batch_size
+        assert len(batch) * max(lengths[i] for i in batch) <= settings.batch_tokens
+    # sequences are batched in order of length
+    assert batches == [[6, 5, 1], [3, 2], [7, 0], [4]]
+    # a sequence longer than the budget gets a batch of its own
+    assert ContrastiveLearningAPI._make_batches(settings, [50, 2]) == [[1], [0]]
+
+
+def test_standard_embeddings_are_stored_once_per_version(tmp_path, monkeypatch):
+    # given
+    monkeypatch.setattr(utils, "BDIKIT_STANDARD_EMBEDDINGS_DIR", str(tmp_path))
+    monkeypatch.setattr(utils, "_standard_embeddings", {})
+    api = object.__new__(ContrastiveLearningAPI)
+    api.model_id = "test-model"
+    embedded_tables = []
+
+    def load_table_tokens(table):
+        embedded_tables.append(list(table.columns))
+        return np.array(
+            [[len(column), i] for i, column in enumerate(table.columns)], np.float32
+        )
+
+    api._load_table_tokens = load_table_tokens
+    schema = _load_table_for_standard("gdc")
+    version = schema.attrs["standard_version"]
+    columns = list(schema.columns)
+    subset = [columns[5], columns[0], columns[-1]]
+
+    # when
+    embeddings = api.get_embeddings(schema)
+    first_embedded = list(embedded_tables)
+    subset_embeddings = api.get_embeddings(schema[subset])
+    subset_embedded = list(embedded_tables)
+
+    monkeypatch.setattr(GDC, "get_version", lambda self: "new-release")
+    new_schema = schema[subset]
+    new_schema.attrs["standard_version"] = "new-release"
+    api.get_embeddings(new_schema)
+
+    # then
+    assert first_embedded == [columns]
+    assert isfile(utils.get_standard_embeddings_path("test-model", "gdc", version))
+    assert embeddings.shape == (len(columns), 2)
+
+    assert subset_embedded == first_embedded
+    np.testing.assert_array_equal(
+        subset_embeddings, [[len(c), columns.index(c)] for c in subset]
+    )
+
+    assert embedded_tables == [columns, columns]
+    assert isfile(
+        utils.get_standard_embeddings_path("test-model", "gdc", "new-release")
+    )
+
+
+def test_inference_returns_the_last_cls_vector_of_padded_sequences(offline_dataset):
+    # given
+    torch.manual_seed(0)
+    token_vectors = torch.randn(len(offline_dataset.tokenizer), 4)
+
+    def encoder(x, attention_mask):
+        # the vector of a token depends on its id and position, not on padding
+        positions = torch.arange(x.shape[1], dtype=torch.float32)
+        return token_vectors[x] + positions[None, :, None]
+
+    api = object.__new__(ContrastiveLearningAPI)
+    api.unlabeled = offline_dataset
+    api.encoder = encoder
+    api.device = "cpu"
+    api.embedding_dim = 4
+    api.batch_size = 3
+    api.batch_tokens = 3 * offline_dataset.max_len
+    tables = [
+        pd.DataFrame({"stage": ["Stage I", "Stage II"], "b": ["a"] * 2}),
+        pd.DataFrame({"ethnicity": ["Hispanic or Latino"] * 10}),
+        pd.DataFrame({"a": ["i"], "b": ["ii"], "figo_stage": ["Stage IV"]}),
+        pd.DataFrame({"empty": [""]}),
+    ]
+
+    # when
+    embeddings = api._inference_on_tables(tables)
+
+    # then
+    cls_token_id = offline_dataset.tokenizer.cls_token_id
+    for table, embedding in zip(tables, embeddings):
+        tokens = offline_dataset._tokenize(table)[0]
+        vectors = encoder(torch.tensor([tokens]), None)[0]
+        # the per-token loop that the tensor operations replaced
+        cls_vectors = [
+            vectors[i] for i, token_id in enumerate(tokens) if token_id == cls_token_id
+        ]
+        np.testing.assert_allclose(embedding, cls_vectors[-1].numpy(), rtol=1e-6)
+
+
+@pytest.fixture
+def cached_language_model(tmp_path, monkeypatch, offline_dataset):
+    """
+    A tiny RoBERTa configuration and the word-level tokenizer stored in a
+    temporary bdikit cache, with network connections disabled.
+    """
+    from transformers import RobertaConfig
+
+    monkeypatch.setattr(download, "BDIKIT_MODELS_CACHE_DIR", str(tmp_path))
+    lm_path = download.get_cache_file_path("roberta-base")
+    offline_dataset.tokenizer.save_pretrained(lm_path)
+    RobertaConfig(
+        vocab_size=len(offline_dataset.tokenizer),
+        hidden_size=768,
+        num_hidden_layers=1,
+        num_attention_heads=4,
+        intermediate_size=64,
+        max_position_embeddings=offline_dataset.max_len + 4,
+        pad_token_id=offline_dataset.tokenizer.pad_token_id,
+    ).save_pretrained(lm_path)
+
+    def connect(*args, **kwargs):
+        raise OSError("Network access is disabled in this test")
+
+    monkeypatch.setattr(socket.socket, "connect", connect)
+    monkeypatch.setattr(socket, "create_connection", connect)
+    get_tokenizer.cache_clear()
+    yield lm_path
+    get_tokenizer.cache_clear()
+
+
+def test_model_is_built_from_the_cached_language_model(cached_language_model):
+    # when
+    model = BarlowTwinsSimCLR(0.1, 3.9, device="cpu", pretrained=False)
+
+    # then
+    assert download.get_cached_language_model("roberta-base") == cached_language_model
+    assert model.bert.config.num_hidden_layers == 1
+    assert model.cls_token_id == get_tokenizer().cls_token_id
+
+
+def test_quantized_encoder_is_close_to_fp32_encoder(cached_language_model):
+    from transformers import RobertaModel
+
+    # given
+    torch.manual_seed(0)
+    model = BarlowTwinsSimCLR(0.1, 3.9, device="cpu", pretrained=False)
+    # the weights of models built from a configuration are not initialized
+    model.bert.load_state_dict(RobertaModel(model.bert.config).state_dict())
+    vocab_size = model.bert.config.vocab_size
+    x = torch.randint(4, vocab_size, (3, 20))
+    attention_mask = torch.ones_like(x)
+    attention_mask[1, 12:] = 0
+    attention_mask[2, 5:] = 0
+
+    # when
+    with torch.no_grad():
+        expected = create_eager_encoder(model)(x, attention_mask)
+        encoder = create_eager_encoder(model, quantize=True)
+        z = encoder(x, attention_mask)
+
+    # then
+    assert isinstance(encoder.projector, torch.ao.nn.quantized.dynamic.Linear)
+    mask = attention_mask.bool()
+    similarities = torch.nn.functional.cosine_similarity(z[mask], expected[mask])
+    assert similarities.min() > 0.99
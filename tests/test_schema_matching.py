@@ -1,4 +1,5 @@
 import pandas as pd
+from types import SimpleNamespace
 from bdikit.schema_matching.one2one.valentine import (
     SimFloodSchemaMatcher,
     JaccardSchemaMatcher,
@@ -8,6 +9,7 @@ from bdikit.schema_matching.one2one.valentine import (
 )
 from bdikit.schema_matching.one2one.twophase import TwoPhaseSchemaMatcher
 from bdikit.schema_matching.one2one.contrastivelearning import ContrastiveLearningSchemaMatcher
+from bdikit.schema_matching.one2one.gpt import GPTSchemaMatcher
 
 
 def test_basic_column_mapping_algorithms():
@@ -40,3 +42,68 @@ def test_basic_column_mapping_algorithms():
             "column_1": "column_1a",
             "col_2": "col2",
         } == mapping, f"{type(column_matcher).__name__} failed to map columns"
+
+
+class StubSchemaChatClient:
+    """Offline stand-in for the OpenAI client that answers with fixed column types."""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.prompts = []
+        self.models = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        prompt = messages[-1]["content"]
+        self.prompts.append(prompt)
+        self.models.append(model)
+        context = prompt.split("CONTEXT: ")[1]
+        content = next(a for c, a in self.answers.items() if context.startswith(c))
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def test_gpt_schema_matcher_with_stub_client(tmp_path):
+    # given
+    source = pd.DataFrame(
+        {
+            "gender": ["male", "female"] * 20,
+            "age": list(range(40)),
+        }
+    )
+    target = pd.DataFrame({"sex": ["m", "f"], "age_at_diagnosis": [1, 2]})
+    client = StubSchemaChatClient(
+        {"gender": "gender; sex; age_at_diagnosis", "age": "age_at_diagnosis;sex"}
+    )
+    cache_path = str(tmp_path / "responses.sqlite")
+
+    # when
+    matches = GPTSchemaMatcher(client=client, cache_path=cache_path).map(
+        source, target
+    )
+    rerun_matches = GPTSchemaMatcher(client=client, cache_path=cache_path).map(
+        source, target
+    )
+
+    # then
+    assert matches == {"gender": "sex", "age": "age_at_diagnosis"}
+    assert rerun_matches == matches
+    # the sampled values are the same in both runs, so responses are cached
+    assert len(client.prompts) == 2
+
+
+def test_gpt_schema_matcher_get_column_type_uses_the_given_model():
+    # given
+    client = StubSchemaChatClient({"gender": "sex; age_at_diagnosis"})
+    matcher = GPTSchemaMatcher(model="default-model", client=client, use_cache=False)
+    labels = "sex, age_at_diagnosis"
+
+    # when
+    default_types = matcher.get_column_type("gender: male, female", labels)
+    model_types = matcher.get_column_type(
+        "gender: male, female", labels, model="other-model"
+    )
+
+    # then
+    assert default_types == model_types == ["sex", "age_at_diagnosis"]
+    assert client.models == ["default-model", "other-model"]
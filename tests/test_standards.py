@@ -0,0 +1,74 @@
+import json
+from bdikit.standards.standard_factory import Standards
+from bdikit.standards.gdc import GDC_SCHEMA_PATH
+from bdikit.standards.target_schema import TargetSchema
+
+
+def test_gdc_index_matches_schema_file():
+    # given
+    with open(GDC_SCHEMA_PATH) as json_file:
+        data = json.load(json_file)
+    column_names = ["primary_diagnosis", "age_at_diagnosis", "unknown_column"]
+
+    # when
+    gdc = Standards.get_standard("gdc")
+    column_values = gdc.get_column_values(column_names)
+    column_metadata = gdc.get_column_metadata(column_names)
+
+    # then
+    assert gdc.get_columns() == list(data.keys())
+    for column_name in column_names[:2]:
+        value_data = data[column_name]["value_data"]
+        assert column_values[column_name] == list(value_data.keys())
+        assert column_metadata[column_name] == {
+            "description": data[column_name]["column_description"],
+            "value_names": list(value_data.keys()),
+            "value_descriptions": list(value_data.values()),
+        }
+    assert column_values["unknown_column"] == []
+    assert column_metadata["unknown_column"] == {
+        "description": "",
+        "value_names": [],
+        "value_descriptions": [],
+    }
+
+
+def test_get_standard_reuses_loaded_standard():
+    assert Standards.get_standard("gdc") is Standards.get_standard("gdc")
+
+
+def test_target_schema_keeps_unpadded_domains():
+    # given
+    schema = TargetSchema(
+        {"color": ["red", "green", "blue"], "size": ["small"]},
+        attrs={"standard": "test"},
+    )
+
+    # when
+    subset = schema[["size"]]
+    df = schema.to_dataframe()
+
+    # then
+    assert list(schema.columns) == ["color", "size"]
+    assert schema["size"].tolist() == ["small"]
+    assert list(subset.columns) == ["size"]
+    assert subset.num_rows == 3
+    assert df.attrs["standard"] == "test"
+    assert df["color"].tolist() == ["red", "green", "blue"]
+    assert df["size"].tolist() == ["small", None, None]
+    assert schema.get_padded_column("size").tolist() == ["small", None, None]
+
+
+def test_gdc_target_schema_matches_dataframe_rep():
+    # given
+    gdc = Standards.get_standard("gdc")
+
+    # when
+    schema = gdc.get_target_schema()
+    df = gdc.get_dataframe_rep()
+
+    # then
+    assert list(schema.columns) == list(df.columns)
+    assert schema.num_rows == len(df)
+    column = "primary_diagnosis"
+    assert schema[column].tolist() == df[column].dropna().tolist()
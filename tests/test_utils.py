@@ -0,0 +1,110 @@
+import os
+import sqlite3
+import pytest
+import numpy as np
+import pandas as pd
+from bdikit import utils
+from bdikit.utils import (
+    EMBEDDING_INDEX_FILE,
+    SQLiteCache,
+    check_embedding_cache,
+    hash_dataframe,
+    read_embeddings_file,
+    write_embeddings_file,
+    write_embeddings_to_cache,
+)
+
+
+def test_hash_dataframe():
+    # given
+    df = pd.DataFrame({"stage": ["Stage I", "Stage II", "Stage III"], "age": [1, 2, 3]})
+    changed_df = df.assign(age=[1, 2, 4])
+    nested_df = pd.DataFrame({"values": [["a", "b"], {"c": 1}, None]})
+
+    # when
+    fingerprint = hash_dataframe(df)
+
+    # then
+    assert fingerprint == hash_dataframe(df.copy())
+    assert fingerprint == hash_dataframe(df, chunk_size=2)
+    assert fingerprint != hash_dataframe(changed_df)
+    assert fingerprint != hash_dataframe(df.rename(columns={"age": "years"}))
+
+    assert hash_dataframe(df, rows=[0, 1]) == hash_dataframe(changed_df, rows=[0, 1])
+    assert hash_dataframe(df, rows=[0, 1]) != hash_dataframe(df, rows=[0, 2])
+    assert hash_dataframe(df, rows=[0, 1]) != fingerprint
+
+    assert hash_dataframe(nested_df) == hash_dataframe(nested_df.copy())
+    assert hash_dataframe(nested_df) != hash_dataframe(nested_df, rows=[0])
+
+
+def test_embedding_cache_round_trip(tmp_path, monkeypatch):
+    # given
+    monkeypatch.setattr(utils, "BDIKIT_EMBEDDINGS_CACHE_DIR", str(tmp_path))
+    model_id = "test-model"
+    first_batch = np.arange(6, dtype=np.float32).reshape(2, 3)
+    second_batch = np.arange(6, 9, dtype=np.float32).reshape(1, 3)
+    third_batch = np.full((1, 3), 9.0, dtype=np.float32)
+
+    # when
+    write_embeddings_to_cache(["k1", "k2"], first_batch, model_id, ["a", "b"])
+    write_embeddings_to_cache(["k3"], second_batch, model_id, ["c"])
+    embedding_files = sorted(
+        name for name in os.listdir(tmp_path / model_id) if name.endswith(".emb")
+    )
+    embeddings, header = read_embeddings_file(
+        os.path.join(tmp_path, model_id, embedding_files[0])
+    )
+    cached = check_embedding_cache(["k1", "k2", "k3", "k4"], model_id)
+
+    # then
+    assert len(embedding_files) == 2
+    assert embeddings.dtype == np.float32
+    assert header["model"] == model_id and header["dim"] == 3
+    assert sorted(cached) == ["k1", "k2", "k3"]
+    np.testing.assert_array_equal(cached["k1"], first_batch[0])
+    np.testing.assert_array_equal(cached["k2"], first_batch[1])
+    np.testing.assert_array_equal(cached["k3"], second_batch[0])
+
+    # a trailing line that is still being written is ignored until completed
+    write_embeddings_file(
+        os.path.join(tmp_path, model_id, "third.emb"), third_batch, model_id, ["d"]
+    )
+    index_file = os.path.join(tmp_path, model_id, EMBEDDING_INDEX_FILE)
+    with open(index_file, "a") as file:
+        file.write("k4\tthird.emb")
+    assert "k4" not in check_embedding_cache(["k4"], model_id)
+
+    with open(index_file, "a") as file:
+        file.write("\t0\n")
+    cached = check_embedding_cache(["k1", "k4"], model_id)
+    assert sorted(cached) == ["k1", "k4"]
+    np.testing.assert_array_equal(cached["k4"], third_batch[0])
+
+
+class NumbersCache(SQLiteCache):
+    schema = "CREATE TABLE IF NOT EXISTS numbers (value INTEGER PRIMARY KEY)"
+
+
+def test_sqlite_cache_queries_values_in_chunks_and_opens_read_only(tmp_path):
+    # given
+    path = str(tmp_path / "numbers.sqlite")
+    cache = NumbersCache(path)
+    cache._executemany("INSERT INTO numbers VALUES (?)", [(i,) for i in range(1200)])
+    read_only_cache = NumbersCache(path, read_only=True)
+    values = list(range(0, 2400, 2))
+
+    # when
+    rows = cache._execute_in(
+        "SELECT value FROM numbers WHERE value >= ? AND value IN ({})", values, (10,)
+    )
+    read_only_rows = read_only_cache._execute_in(
+        "SELECT value FROM numbers WHERE value IN ({})", values
+    )
+
+    # then
+    assert len(values) > cache.max_parameters
+    assert sorted(value for (value,) in rows) == list(range(10, 1200, 2))
+    assert sorted(value for (value,) in read_only_rows) == list(range(0, 1200, 2))
+    with pytest.raises(sqlite3.OperationalError):
+        read_only_cache._execute("INSERT INTO numbers VALUES (?)", (5000,))
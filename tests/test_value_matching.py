@@ -4,13 +4,35 @@ from bdikit.value_matching.polyfuzz import (
     FastTextValueMatcher,
     EmbeddingValueMatcher,
 )
+from bdikit.value_matching.polyfuzz import get_tfidf_target_index
+from bdikit.value_matching.rapidfuzz import RapidFuzzValueMatcher
+from bdikit.value_matching import blocking
+from bdikit.value_matching.blocking import QGramIndex, BlockingValueMatcher
+from bdikit.value_matching.exact import ExactValueMatcher
+from bdikit.value_matching.cascade import CascadeValueMatcher
+from bdikit.value_matching.gpt import GPTValueMatcher
+from bdikit.value_matching.base import ValueMatch, ValueMatches
+from bdikit.llm import complete_with_retry
+from rapidfuzz import fuzz
+from types import SimpleNamespace
+from typing import Optional
+import ast
+import random
+import re
+import string
+import threading
+import httpx
+import openai
+import pytest
 
 
 def test_textual_transformation_matching():
     threshold = 0.5
     for value_matcher in [
         TFIDFValueMatcher(threshold=threshold),
+        TFIDFValueMatcher(threshold=threshold, cache_target_index=True),
         EditDistanceValueMatcher(threshold=threshold),
+        RapidFuzzValueMatcher(threshold=threshold),
     ]:
     
         # given
@@ -74,4 +96,314 @@ def test_semantic_matching():
     assert mapped_matches["Display"][0] == "Monitor"
 
     scores = [match[2] for match in matches]
-    assert all(score > threshold for score in scores)
\ No newline at end of file
+    assert all(score > threshold for score in scores)
+
+
+def test_qgram_index_does_not_prune_similar_values():
+    # given
+    target_values = ["apple", "banana", "orange", "kiwi", "pineapple", "grape"]
+    source_values = ["Red Apple", "Banana", "Oorange", "dragon-fruits", "grapes", ""]
+    threshold = 0.5
+
+    # when
+    index = QGramIndex(target_values, q=2)
+    candidates = index.candidates(source_values, threshold)
+
+    # then
+    for source_value, positions in zip(source_values, candidates):
+        for i, target_value in enumerate(target_values):
+            if fuzz.ratio(source_value, target_value) / 100 >= threshold:
+                assert i in positions
+    assert len(candidates[3]) < len(target_values)
+
+
+def test_blocking_value_matcher():
+    # given
+    source_values = ["Red Apple", "Banana", "Oorange", "dragon-fruits"]
+    target_values = ["apple", "banana", "orange", "kiwi"]
+    threshold = 0.5
+
+    # when
+    blocking_matches = BlockingValueMatcher(
+        "edit_distance", threshold=threshold
+    ).match(source_values, target_values)
+    matches = EditDistanceValueMatcher(threshold=threshold).match(
+        source_values, target_values
+    )
+
+    # then
+    assert sorted(blocking_matches) == sorted(matches)
+
+
+def test_blocking_value_matcher_calls_other_matchers_once_per_chunk(
+    recording_value_matcher,
+):
+    # given
+    source_values = ["Red Apple", "Banana", "Oorange", "kiwi fruit"]
+    target_values = ["apple", "banana", "orange", "kiwi"]
+    matcher = recording_value_matcher(threshold=0.5)
+
+    # when
+    matches = BlockingValueMatcher(matcher, chunk_size=2).match(
+        source_values, target_values
+    )
+
+    # then
+    assert matcher.calls == 2
+    assert sorted(matches) == sorted(
+        EditDistanceValueMatcher(threshold=0.5).match(source_values, target_values)
+    )
+
+
+def test_blocking_value_matcher_scores_only_candidate_pairs(monkeypatch):
+    # given
+    rng = random.Random(0)
+    target_values = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(10, 30)))
+        for _ in range(2000)
+    ]
+    source_values = [value[:-1] + "!" for value in rng.sample(target_values, 300)]
+    matcher = EditDistanceValueMatcher(threshold=0.8)
+    scored_pairs = []
+    cpdist = blocking.process.cpdist
+
+    def counting_cpdist(queries, choices, **kwargs):
+        scored_pairs.append(len(queries))
+        return cpdist(queries, choices, **kwargs)
+
+    monkeypatch.setattr(blocking.process, "cpdist", counting_cpdist)
+
+    # when
+    blocking_matches = BlockingValueMatcher(matcher).match(
+        source_values, target_values
+    )
+    matches = matcher.match(source_values, target_values)
+
+    # then
+    assert sorted(blocking_matches) == sorted(matches)
+    assert len(scored_pairs) == 1
+    assert scored_pairs[0] < 0.01 * len(source_values) * len(target_values)
+
+
+def test_rapidfuzz_top_k_matching():
+    # given
+    source_values = ["Red Apple", "Banana", "dragon-fruits"]
+    target_values = ["apple", "pineapple", "banana", "orange"]
+
+    # when
+    matches = RapidFuzzValueMatcher(threshold=0.5, top_k=2).match(
+        source_values, target_values
+    )
+
+    # then
+    top_matches = {}
+    for source_value, target_value, similarity in matches:
+        top_matches.setdefault(source_value, []).append((target_value, similarity))
+    assert "dragon-fruits" not in top_matches
+    assert [target for target, _ in top_matches["Red Apple"]] == ["apple", "pineapple"]
+    assert top_matches["Banana"][0][0] == "banana"
+    for source_value, target_matches in top_matches.items():
+        similarities = [similarity for _, similarity in target_matches]
+        assert similarities == sorted(similarities, reverse=True)
+        assert all(similarity >= 0.5 for similarity in similarities)
+
+
+def test_tfidf_target_index_is_fitted_once():
+    # given
+    target_values = ["apple", "banana", "orange", "kiwi"]
+    value_matcher = TFIDFValueMatcher(threshold=0.5, cache_target_index=True)
+
+    # when
+    first_matches = value_matcher.match(["Red Apple", "Banana"], target_values)
+    index = get_tfidf_target_index(tuple(target_values), (1, 3), True)
+    second_matches = value_matcher.match(["Oorange", "Banana"], target_values)
+
+    # then
+    assert get_tfidf_target_index(tuple(target_values), (1, 3), True) is index
+    assert [match.target_value for match in first_matches] == ["banana", "apple"]
+    assert [match.target_value for match in second_matches] == ["banana", "orange"]
+
+
+class StubChatClient:
+    """Offline stand-in for the OpenAI client that matches terms by lowercasing them."""
+
+    def __init__(self, failures: int = 0, error: Optional[Exception] = None):
+        self.calls = 0
+        self.failures = failures
+        self.error = error
+        self.lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        with self.lock:
+            self.calls += 1
+            if self.error is not None:
+                raise self.error
+            if self.failures > 0:
+                self.failures -= 1
+                raise openai.APIConnectionError(
+                    request=httpx.Request("POST", "https://api.openai.com")
+                )
+        prompt = messages[-1]["content"]
+        batch = re.search(r"For each of the terms (\[.*?\]), choose", prompt)
+        if batch is None:
+            term = re.search(r'For the term: "(.*?)"', prompt).group(1)
+            content = str({"term": term.lower(), "score": 0.9})
+        else:
+            terms = ast.literal_eval(batch.group(1))
+            content = str(
+                [{"source": t, "term": t.lower(), "score": 0.9} for t in terms]
+            )
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def test_gpt_value_matcher_batches_and_caches_responses(tmp_path):
+    # given
+    source_values = ["Apple", "Banana", "Orange", "Dragon-fruit", "Kiwi"]
+    target_values = ["apple", "banana", "orange", "kiwi"]
+    cache_path = str(tmp_path / "responses.sqlite")
+    client = StubChatClient()
+
+    # when
+    matcher = GPTValueMatcher(
+        batch_size=2, max_workers=4, cache_path=cache_path, client=client
+    )
+    matches = matcher.match(source_values, target_values)
+    calls_first_run = client.calls
+    rerun_matches = GPTValueMatcher(
+        batch_size=2, cache_path=cache_path, client=client
+    ).match(source_values, target_values)
+
+    # then
+    assert sorted(matches) == [
+        ("Apple", "apple", 0.9),
+        ("Banana", "banana", 0.9),
+        ("Kiwi", "kiwi", 0.9),
+        ("Orange", "orange", 0.9),
+    ]
+    assert calls_first_run == 3
+    assert client.calls == calls_first_run
+    assert sorted(rerun_matches) == sorted(matches)
+
+
+def test_gpt_requests_are_retried():
+    # given
+    client = StubChatClient(failures=2)
+    messages = [{"role": "user", "content": 'For the term: "Apple", choose'}]
+
+    # when
+    response = complete_with_retry(
+        client, "model", messages, max_retries=2, initial_backoff=0
+    )
+
+    # then
+    assert client.calls == 3
+    assert ast.literal_eval(response)["term"] == "apple"
+
+
+def test_gpt_value_matcher_raises_non_retryable_errors(tmp_path):
+    # given
+    request = httpx.Request("POST", "https://api.openai.com")
+    error = openai.AuthenticationError(
+        "Incorrect API key provided",
+        response=httpx.Response(401, request=request),
+        body=None,
+    )
+    client = StubChatClient(error=error)
+    matcher = GPTValueMatcher(
+        cache_path=str(tmp_path / "responses.sqlite"), client=client
+    )
+
+    # when / then
+    with pytest.raises(openai.AuthenticationError):
+        matcher.match(["Apple", "Banana"], ["apple", "banana"])
+    assert client.calls == 1
+
+
+def test_polyfuzz_matches_are_columnar():
+    # given
+    source_values = ["Red Apple", "Banana", "Oorange", "dragon-fruits"]
+    target_values = ["apple", "pineapple", "banana", "orange"]
+
+    # when
+    matches = TFIDFValueMatcher(threshold=0.3, top_k=2).match(
+        source_values, target_values
+    )
+
+    # then
+    assert isinstance(matches, ValueMatches)
+    assert len(matches) == len(matches.similarities)
+    assert all(isinstance(match, ValueMatch) for match in matches)
+    assert matches[0] == ValueMatch(
+        matches.source_values[0], matches.target_values[0], matches.similarities[0]
+    )
+    assert all(similarity >= 0.3 for similarity in matches.similarities)
+    assert ("Banana", "banana") in {(m.source_value, m.target_value) for m in matches}
+
+
+def test_value_matches_concatenate():
+    # given
+    columnar = ValueMatches(["Banana", "Oorange"], ["banana", "orange"], [0.9, 0.7])
+    listed = [ValueMatch("apple", "apple", 1.0), ValueMatch("kiwi", "kiwi", 0.7)]
+
+    # when
+    matches = ValueMatches.concatenate([columnar, listed, []])
+
+    # then
+    assert isinstance(matches, ValueMatches)
+    assert matches == [
+        ValueMatch("apple", "apple", 1.0),
+        ValueMatch("Banana", "banana", 0.9),
+        ValueMatch("Oorange", "orange", 0.7),
+        ValueMatch("kiwi", "kiwi", 0.7),
+    ]
+    assert len(ValueMatches.concatenate([[], []])) == 0
+
+
+def test_exact_value_matcher():
+    # given
+    source_values = ["Stage I", "stage  ii", " STAGE III", "Stage IV", "stage"]
+    target_values = ["Stage I", "Stage II", "Stage III", "Stage IIIA"]
+
+    # when
+    matches = ExactValueMatcher().match(source_values, target_values)
+    strict_matches = ExactValueMatcher(normalize=False).match(
+        source_values, target_values
+    )
+
+    # then
+    assert matches == [
+        ValueMatch("Stage I", "Stage I", 1.0),
+        ValueMatch("stage  ii", "Stage II", 1.0),
+        ValueMatch(" STAGE III", "Stage III", 1.0),
+    ]
+    assert strict_matches == [ValueMatch("Stage I", "Stage I", 1.0)]
+
+
+def test_cascade_value_matcher(recording_value_matcher):
+    # given
+    source_values = ["Stage I", "stage ii", "Stgae III", "zzz"]
+    target_values = ["Stage I", "Stage II", "Stage III", "Stage IV"]
+    last_stage = recording_value_matcher(threshold=0.0)
+    value_matcher = CascadeValueMatcher(
+        [("exact", 1.0), ("edit_distance", 0.85), (last_stage, 0.5)],
+        threshold=0.5,
+    )
+
+    # when
+    matches = value_matcher.match(source_values, target_values)
+    stats = value_matcher.get_stats()
+
+    # then
+    assert matches == [
+        ValueMatch("Stage I", "Stage I", 1.0),
+        ValueMatch("stage ii", "Stage II", 1.0),
+        ValueMatch("Stgae III", "Stage III", fuzz.ratio("Stgae III", "Stage III") / 100),
+    ]
+    # only the value that no stage accepted reaches the last stage
+    assert last_stage.matched_values == ["zzz"]
+    assert stats["stage"].tolist() == ["exact", "edit_distance", "RecordingValueMatcher"]
+    assert stats["values"].tolist() == [4, 2, 1]
+    assert stats["accepted"].tolist() == [2, 1, 0]
+    assert (stats["seconds"] >= 0).all()